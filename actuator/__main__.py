@@ -1,10 +1,12 @@
 from tui import TuiApp
 from config import read_conifg, get_config
 from log import logger
-from consts import threadings
+from consts import threadings, cancel_events
+from utils.image import warmup_ocr_engines, configure_ocr_cache
 
 from typing import Callable
 from platform import system
+from threading import Thread
 
 import keyboard
 import ctypes
@@ -16,6 +18,9 @@ def stop_script() -> None:
     notice_function("尝试停止所有脚本")
     logger.info("尝试停止所有脚本")
     
+    for event in cancel_events:
+        event.set() # 让正在等待的脚本立即返回
+    
     for threading in threadings:
         thread_id = threading.ident
         ctypes.pythonapi.PyThreadState_SetAsyncExc(thread_id, ctypes.py_object(SystemExit))
@@ -38,6 +43,9 @@ def main() -> None:
     
     notice_function = app.notify
     
+    configure_ocr_cache()
+    Thread(target=warmup_ocr_engines, daemon=True).start()
+    
     app.run()
 
 if __name__ == "__main__":
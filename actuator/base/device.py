@@ -1,8 +1,15 @@
 from typing import Type
 from abc import ABC, abstractmethod
+from collections import deque
+from threading import Thread, Condition, Event
+from time import monotonic, sleep
 
 import inspect
 
+from model import Tip, Image
+from log import logger
+from utils.image import FrameChangeDetector
+
 kind_translation_str = {
     "POSITIONAL_ONLY": "仅限位置参数",
     "POSITIONAL_OR_KEYWORD": "位置或关键字参数",
@@ -63,11 +70,216 @@ def register_platform(platform: Type[Platform]):
     platforms.append(platform)
     
     
+_GESTURES = {
+    "tap": "tap", "click": "tap",
+    "swipe": "swipe",
+    "key": "key", "keyevent": "key",
+    "sleep": "sleep", "wait": "sleep", "delay": "sleep",
+}
+
+_GESTURE_ARGS = {"tap": (2,), "swipe": (4, 5), "key": (1,), "sleep": (1,)}
+
+_GESTURE_METHODS = {"tap": "click", "swipe": "swipe", "key": "keyevent"}
+
+def parse_gestures(steps: list) -> list[tuple[str, list]]:
+    """解析手势序列
+    Args:
+        steps (list): 手势列表，每项为 ["tap", x, y]、["swipe", x1, y1, x2, y2, 秒]、["key", 键值] 或 ["sleep", 秒]，坐标可用 Point 代替
+    Returns:
+        list[tuple[str, list]]: (手势类型, 参数) 列表，滑动未指定时长时为 0.3 秒
+    """
+    gestures = []
+    for index, step in enumerate(steps, start=1):
+        step = list(step) if isinstance(step, (list, tuple)) else [step]
+        name = _GESTURES.get(str(step[0]).lower()) if step else None
+        
+        args = []
+        for value in step[1:]:
+            args.extend(value.to_tuple() if hasattr(value, "x") else (value,))
+        
+        if name is None or len(args) not in _GESTURE_ARGS[name]:
+            raise ValueError(f"第 {index} 个手势 {step} 格式错误")
+        if name == "swipe" and len(args) == 4:
+            args.append(0.3)
+        gestures.append((name, args))
+    return gestures
+
+class Frame:
+    """持续截图得到的一帧"""
+    def __init__(self, index: int, timestamp: float, image: Image):
+        self.index = index
+        """帧序号，从 1 开始递增"""
+        self.timestamp = timestamp
+        """截图完成时的 time.monotonic()"""
+        self.image = image
+
+    def __str__(self):
+        return f"第 {self.index} 帧 {self.image}"
+
 class Devices:
     
+    _frames: deque[Frame] | None = None
+    _frame_index: int = 0
+    _frame_condition: Condition | None = None
+    _stream_stop: Event | None = None
+    _stream_thread: Thread | None = None
+    _change_detector: FrameChangeDetector | None = None
+    
     def __init__(self, name: str):
         self.name = name
     
+    def batch(self, steps: list) -> Tip:
+        """依次执行一组点击、滑动、按键与等待
+        Args:
+            steps (list): 手势列表，如 {{"tap", 100, 200}, {"sleep", 0.05}, {"swipe", 100, 200, 300, 400, 0.2}, {"key", 4}}
+        """
+        gestures = parse_gestures(steps)
+        
+        # 执行前检查，避免执行到一半才发现设备不支持
+        missing = sorted({name for name, _ in gestures if name in _GESTURE_METHODS and not hasattr(self, _GESTURE_METHODS[name])})
+        if missing:
+            return Tip(f"{self.name} 不支持 {', '.join(missing)} 手势，未执行任何手势")
+        
+        for name, args in gestures:
+            if name == "tap":
+                self.click(*args)
+            elif name == "swipe":
+                self.swipe(*args)
+            elif name == "key":
+                self.keyevent(*args)
+            else:
+                sleep(args[0])
+        return Tip(f"{self.name} 执行了 {len(gestures)} 个手势")
+    
+    def _track_frame(self, image: Image) -> None:
+        """记录新的截图，用于判断画面变化"""
+        if self._change_detector is None:
+            self._change_detector = FrameChangeDetector()
+        self._change_detector.update(image)
+    
+    def screen_token(self) -> int:
+        """获取当前画面的令牌，之后可通过 screen_changed 与 changed_regions 判断画面是否变化"""
+        return self._change_detector.token() if self._change_detector else 0
+    
+    def screen_changed(self, token: int, threshold: int = None) -> bool:
+        """最新的截图相对令牌对应的画面是否变化
+        Args:
+            token (int): screen_token 获取的令牌
+            threshold (int): 缩略图灰度差阈值
+        """
+        return self._change_detector.changed(token, threshold) if self._change_detector else False
+    
+    def changed_regions(self, token: int, threshold: int = None) -> list[tuple[int, int, int, int]]:
+        """最新的截图相对令牌对应的画面变化的区域 (x1, y1, x2, y2)
+        Args:
+            token (int): screen_token 获取的令牌
+            threshold (int): 缩略图灰度差阈值
+        """
+        return self._change_detector.changed_regions(token, threshold) if self._change_detector else []
+    
+    @property
+    def streaming(self) -> bool:
+        """是否正在持续截图"""
+        return self._stream_thread is not None and self._stream_thread.is_alive()
+    
+    def _stream_loop(self, stop: Event, frames: deque[Frame], condition: Condition, interval: float) -> None:
+        """持续截图线程，只使用启动时创建的停止事件与缓冲区，停止后即使截图较慢也不会写入新的缓冲区
+        
+        子类实现 _capture() -> Image 返回一张新的截图且不修改设备保存的截图，才能持续截图
+        """
+        while not stop.is_set():
+            try:
+                image = self._capture()
+            except Exception as e:
+                logger.warning(f"{self.name} 持续截图失败 {e}")
+                stop.wait(1)
+                continue
+            
+            if stop.is_set():
+                break
+            
+            self._track_frame(image)
+            with condition:
+                self._frame_index += 1
+                frames.append(Frame(self._frame_index, monotonic(), image))
+                condition.notify_all()
+            
+            if interval > 0:
+                stop.wait(interval)
+    
+    def start_stream(self, size: int = 3, interval: float = 0.0) -> Tip:
+        """开始在后台持续截图，之后 screenshot 与 get_screenshot 直接返回最新的一帧
+        Args:
+            size (int): 保留的最近帧数量
+            interval (float): 两次截图之间的间隔 (秒)
+        """
+        if self.streaming:
+            return Tip(f"{self.name} 已在持续截图")
+        if not hasattr(self, "_capture"):
+            return Tip(f"{self.name} 不支持持续截图")
+        
+        self._frames = deque(maxlen=max(int(size), 1))
+        self._frame_condition = Condition()
+        self._stream_stop = Event()
+        self._stream_thread = Thread(
+            target=self._stream_loop,
+            args=(self._stream_stop, self._frames, self._frame_condition, float(interval)),
+            daemon=True,
+            name=f"stream-{self.name}",
+        )
+        self._stream_thread.start()
+        return Tip(f"{self.name} 开始持续截图，保留最近 {self._frames.maxlen} 帧")
+    
+    def stop_stream(self, timeout: float = 5) -> Tip:
+        """停止持续截图
+        Args:
+            timeout (float): 等待截图线程退出的最长时间 (秒)，超时后线程会在当前截图完成后自行退出
+        """
+        if not self.streaming:
+            return Tip(f"{self.name} 未在持续截图")
+        
+        self._stream_stop.set()
+        self._stream_thread.join(timeout=timeout)
+        self._stream_thread = None
+        with self._frame_condition:
+            self._frame_condition.notify_all()
+        return Tip(f"{self.name} 停止持续截图")
+    
+    def latest_frame(self) -> Frame | None:
+        """最新的一帧，未持续截图或还没有截图时为 None"""
+        if self._frame_condition is None:
+            return None
+        with self._frame_condition:
+            return self._frames[-1] if self._frames else None
+    
+    def recent_frames(self) -> list[Frame]:
+        """保留的最近几帧，按时间先后排列"""
+        if self._frame_condition is None:
+            return []
+        with self._frame_condition:
+            return list(self._frames)
+    
+    def wait_frame(self, after: int = 0, timeout: float = None) -> Frame | None:
+        """等待序号大于 after 的新一帧
+        Args:
+            after (int): 已处理过的帧序号
+            timeout (float): 最长等待时间 (秒)，None 为一直等待
+        Returns:
+            Frame | None: 新的一帧，超时或未持续截图时为 None
+        """
+        if not self.streaming:
+            return None
+        with self._frame_condition:
+            self._frame_condition.wait_for(lambda: self._frame_index > after or not self.streaming, timeout)
+            return self._frames[-1] if self._frames and self._frames[-1].index > after else None
+    
+    def _stream_image(self) -> Image | None:
+        """持续截图时返回最新一帧的图片"""
+        if not self.streaming:
+            return None
+        frame = self.latest_frame() or self.wait_frame(timeout=5)
+        return frame.image if frame else None
+    
     def __call__(self, *args):
         # TODO 此处重构为更好的方式
         _args = list(args)
@@ -1,10 +1,14 @@
-from threading import Thread
+from threading import Thread, Event
 from devices import DevicesManager
 
 threadings: list[Thread] = []
 """
 存放脚本运行的线程
 """
+cancel_events: list[Event] = []
+"""
+正在运行的脚本的取消事件，停止脚本时设置，让脚本中正在进行的等待立即返回
+"""
 devices_manager: DevicesManager = DevicesManager()
 """
 设备管理器
@@ -3,10 +3,17 @@ from random import randint
 from pathlib import Path
 from typing import Union
 from io import BytesIO
+from shlex import quote
 
 from base import Devices
+from base.device import parse_gestures
 from config import get_config, PATH_WORKING
 from model import Tip, Image
+from log import logger
+
+from .screencap import parse_screencap
+from .shell_session import AdbShellSession, ShellSendError
+from .touch import SendeventTouch, parse_getevent, parse_rotation
 
 class AdbDevice(Devices):
     def __init__(self, name: str, device: _AdbDevice) -> None:
@@ -14,38 +21,124 @@ class AdbDevice(Devices):
         
         self.device = device
         self.random = get_config().extra.get("random", True)
-        self.screenshot_file = BytesIO()
+        self._raw_screenshot = get_config().extra.get("raw_screenshot", True)
+        """使用不压缩的 screencap 截图，省去设备端 PNG 编码与本地解码"""
+        self._screenshot: Image | None = None
+        self._session = AdbShellSession(device) if get_config().extra.get("persistent_shell", True) else None
+        """常驻 shell 连接，输入类命令通过它执行"""
+        self._touch_backend = get_config().extra.get("touch_backend", "input")
+        """点击与滑动的实现方式，input 或 sendevent"""
+        self._touch: SendeventTouch | None = None
+    
+    def _sendevent(self) -> SendeventTouch | None:
+        """查找触摸屏并创建 sendevent 触控，结果会被缓存，找不到时返回 None"""
+        if self._touch is None:
+            screens = parse_getevent(self._shell("getevent -p", timeout=5))
+            if not screens:
+                logger.warning(f"{self.device.serial} 未找到触摸屏，无法使用 sendevent")
+                return None
+            
+            width, height = self.device.window_size(landscape=False)
+            rotation = parse_rotation(self._shell("dumpsys input | grep -m 1 -E 'SurfaceOrientation|orientation='", timeout=5))
+            self._touch = SendeventTouch(screens[0], (width, height), rotation, get_config().extra.get("touch_rate", 30))
+            logger.debug(f"{self.device.serial} 使用 {screens[0]} 方向 {rotation}")
+        return self._touch
+    
+    def _touch_script(self, name: str, args: list) -> str:
+        """生成点击或滑动的命令，sendevent 不可用时使用 input"""
+        touch = self._sendevent() if self._touch_backend == "sendevent" else None
+        if name == "tap":
+            return touch.tap(*args) if touch else f"input tap {args[0]} {args[1]}"
+        x1, y1, x2, y2, duration = args
+        return touch.swipe(x1, y1, x2, y2, duration) if touch else f"input swipe {x1} {y1} {x2} {y2} {int(duration * 1000)}"
+    
+    def reset_touch(self) -> Tip:
+        """重新查找触摸屏与屏幕方向，屏幕旋转后使用"""
+        self._touch = None
+        touch = self._sendevent()
+        return Tip(f"{self.device} 使用 {touch.screen if touch else 'input 命令'} 进行触控")
+    
+    def gesture(self, paths: list, duration: float = 0.3) -> Tip:
+        """多指手势，所有手指同时按下、沿各自的路径移动并同时抬起，需要 sendevent 权限
+        Args:
+            paths (list): 每根手指经过的坐标，如 {{{100, 500}, {100, 200}}, {{300, 500}, {300, 800}}}
+            duration (float): 手势时长 (秒)
+        """
+        touch = self._sendevent()
+        if touch is None:
+            return Tip(f"{self.device} 未找到触摸屏，无法执行多指手势")
+        
+        self._shell(touch.gesture(paths, duration), timeout=duration + 10)
+        return Tip(f"{self.device} 执行 {len(paths)} 指手势 耗时 {duration}")
+    
+    def _shell(self, cmd: str, timeout: float = None) -> str:
+        """执行命令，优先使用常驻 shell 连接，命令未能发出时回退为单独建立连接
+        命令已发出后读取失败或超时会直接抛出，避免点击等命令在设备上执行两次
+        """
+        if self._session is not None:
+            try:
+                return self._session.run(cmd, timeout).rstrip()
+            except ShellSendError as e:
+                logger.warning(f"{self.device.serial} 常驻 shell 连接失败，改用单独连接 {e}")
+        return self.device.shell(cmd, timeout=timeout or 2)
     
     def _offset(self, offset = None):
         """偏移"""
         return randint(-offset, offset)
     
+    def _jitter(self, x: int, y: int) -> tuple[int, int]:
+        """开启随机偏移时为坐标加上偏移"""
+        if not self.random:
+            return x, y
+        return x + self._offset(5), y + self._offset(5)
+    
+    def batch(self, steps: list) -> Tip:
+        """将一组点击、滑动、按键与等待合并为一个 shell 脚本，一次发送到设备执行
+        Args:
+            steps (list): 手势列表，如 {{"tap", 100, 200}, {"sleep", 0.05}, {"swipe", 100, 200, 300, 400, 0.2}, {"key", 4}}
+        """
+        commands = []
+        duration = 0.0
+        for name, args in parse_gestures(steps):
+            if name == "tap":
+                commands.append(self._touch_script(name, [*self._jitter(*args)]))
+            elif name == "swipe":
+                commands.append(self._touch_script(name, [*self._jitter(*args[:2]), *self._jitter(*args[2:4]), args[4]]))
+                duration += args[4]
+            elif name == "key":
+                commands.append(f"input keyevent {args[0]}")
+            else:
+                commands.append(f"sleep {args[0]}")
+                duration += args[0]
+        
+        if commands:
+            # 每条 input 命令约需数百毫秒
+            self._shell("\n".join(commands), timeout=duration + len(commands) + 10)
+        return Tip(f"{self.device} 执行了 {len(commands)} 个手势")
+    
     def click(self, x: int, y: int) -> int:
 
-        x = x + (self._offset(5) if self.random else 0)
-        y = y + (self._offset(5) if self.random else 0)
+        x, y = self._jitter(x, y)
 
-        self.device.click(x, y)
+        self._shell(self._touch_script("tap", [x, y]))
 
         return Tip(f"{self.device} 点击位置 {x} {y}")
     
     def swipe(self, x1: int, y1: int, x2: int, y2: int, time: float) -> int:
 
-        x1 = x1 + (self._offset(5) if self.random else 0)
-        y1 = y1 + (self._offset(5) if self.random else 0)
-        x2 = x2 + (self._offset(5) if self.random else 0)
-        y2 = y2 + (self._offset(5) if self.random else 0)
-        self.device.swipe(x1, y1, x2, y2, time)
+        x1, y1 = self._jitter(x1, y1)
+        x2, y2 = self._jitter(x2, y2)
+        self._shell(self._touch_script("swipe", [x1, y1, x2, y2, time]), timeout=time + 10)
 
         return Tip(f"{self.device} 滑动 {x1} {y1} => {x2} {y2} 耗时 {time}")
     
     def keyevent(self, key_id: int) -> int:
-        self.device.keyevent(key_id)
+        self._shell(f"input keyevent {key_id}")
         return Tip(f"{self.device} 单击按键 {key_id}")
     
     def openApp(self, name: str, appActivity: str) -> int:
 
-        self.device.shell(f'am start {appActivity}', timeout=2)
+        self._shell(f'am start {appActivity}')
 
         return Tip(f"{self.device} 打开了 APP {name}")
     
@@ -54,43 +147,70 @@ class AdbDevice(Devices):
         if isinstance(text, list):
             text = "".join(text)
         
-        self.device.shell(f'input text "{text}"', timeout=2)
+        self._shell(f"input text {quote(text)}")
         return Tip(f"{self.device} 输入文本 {text}")
     
     def shell(self, cmd: str):
         """终端执行命令"""
         
-        return Tip(f"{self.device} 执行 命令 {cmd}", self.device.shell(cmd, timeout=2))
+        return Tip(f"{self.device} 执行 命令 {cmd}"), self._shell(cmd)
     
     def appName(self):
         """前台APP名"""
         
-        res = self.device.shell("dumpsys activity activities | grep \"mResumedActivity\"", timeout=2)
+        res = self._shell("dumpsys activity activities | grep \"mResumedActivity\"")
         
-        return Tip(f"{self.device} 前台 APP {res}", res)
+        return Tip(f"{self.device} 前台 APP {res}"), res
     
-    def get_screenshot(self) -> Image:
-        return Image(self.screenshot_file.getvalue())
+    def get_screenshot(self) -> Image | None:
+        if (image := self._stream_image()) is not None:
+            return image
+        return self._screenshot
+    
+    def _capture(self) -> Image:
+        """截图，优先解析不压缩的 screencap 输出
+        输出格式无法解析时之后都改用 PNG 截图，连接等偶发错误只对本次截图回退
+        """
+        if self._raw_screenshot:
+            try:
+                data = self.device.shell("screencap", encoding=None)
+            except Exception as e:
+                logger.warning(f"{self.device.serial} 原始截图失败，本次改用 PNG 截图 {e}")
+            else:
+                try:
+                    return Image.from_array(parse_screencap(data))
+                except ValueError as e:
+                    logger.warning(f"{self.device.serial} 不支持原始截图，改用 PNG 截图 {e}")
+                    self._raw_screenshot = False
+        
+        buffer = BytesIO()
+        self.device.screenshot().save(buffer, format="PNG")
+        return Image(buffer.getvalue())
     
     def screenshot(self, filePath: Path= None):
         
         save_object = None
         
-        self.screenshot_file.seek(0)
-        self.screenshot_file.truncate(0)
-        
         if get_config().save_screenshot:
             save_object = PATH_WORKING / f"{self.name}.png"
             
         if filePath:
             save_object = filePath
         
+        if filePath is None and (image := self._stream_image()) is not None:
+            if save_object:
+                image.save(save_object)
+                return Tip(f"{self.device.serial} 持续截图中，返回最新的一帧并保存到了 {save_object}"), image
+            return Tip(f"{self.device.serial} 持续截图中，返回最新的一帧"), image
+        
+        self._screenshot = None
+        
         try:
-            self.device.screenshot().save(self.screenshot_file)
+            self._screenshot = self._capture()
+            self._track_frame(self._screenshot)
             if save_object:
-                with open(save_object, 'wb') as file:
-                    file.write(self.screenshot_file.getvalue())
-                    return Tip(f"对 {self.device.serial} 的截图并保存到了 {save_object}"), self.get_screenshot()
+                self._screenshot.save(save_object)
+                return Tip(f"对 {self.device.serial} 的截图并保存到了 {save_object}"), self.get_screenshot()
             
             return Tip(f"对 {self.device.serial} 进行截图并保存到内存"), self.get_screenshot()
             
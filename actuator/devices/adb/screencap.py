@@ -0,0 +1,32 @@
+import numpy as np
+
+# screencap 输出的像素格式 (android PixelFormat)
+PIXEL_FORMAT_RGBA_8888 = 1
+PIXEL_FORMAT_RGBX_8888 = 2
+PIXEL_FORMAT_BGRA_8888 = 5
+
+def parse_screencap(data: bytes) -> np.ndarray:
+    """解析不带 -p 参数的 screencap 输出
+    输出由文件头 (宽、高、像素格式，Android 9 起还有色彩空间) 与未压缩的像素数据组成
+    Args:
+        data (bytes): screencap 的原始输出
+    Returns:
+        np.ndarray: BGR 像素数组
+    """
+    if len(data) < 12:
+        raise ValueError("screencap 输出过短")
+
+    width, height, pixel_format = np.frombuffer(data, "<u4", 3)
+    width, height = int(width), int(height)
+    if pixel_format not in (PIXEL_FORMAT_RGBA_8888, PIXEL_FORMAT_RGBX_8888, PIXEL_FORMAT_BGRA_8888):
+        raise ValueError(f"不支持的像素格式 {pixel_format}")
+
+    size = width * height * 4
+    header = len(data) - size
+    if header not in (12, 16):
+        raise ValueError(f"screencap 数据长度 {len(data)} 与分辨率 {width}x{height} 不一致")
+
+    pixels = np.frombuffer(data, np.uint8, size, header).reshape(height, width, 4)
+    if pixel_format == PIXEL_FORMAT_BGRA_8888:
+        return pixels[:, :, :3].copy()
+    return pixels[:, :, 2::-1].copy()
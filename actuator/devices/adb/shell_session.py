@@ -0,0 +1,123 @@
+from adbutils import AdbDevice as _AdbDevice, AdbConnection, AdbError
+from itertools import count
+from shlex import quote
+from threading import Lock
+
+import re
+
+from log import logger
+
+class ShellSendError(ConnectionError):
+    """命令未能发送到设备，可以安全地改用其他方式执行"""
+
+class AdbShellSession:
+    """在设备上常驻一个 sh 进程，命令通过同一个连接依次执行，省去每条命令重新建立 adb 连接的开销
+    每条命令之后输出带序号的结束标记与退出码，据此切分各条命令的输出
+    """
+    _sessions = count(1)
+
+    def __init__(self, device: _AdbDevice, timeout: float = 10.0):
+        """
+        Args:
+            device (AdbDevice): adbutils 设备
+            timeout (float, optional): 等待命令结果的超时时间 (秒)
+        """
+        self.device = device
+        self.timeout = timeout
+        self._prefix = f"__ROSE_{next(self._sessions)}_"
+        self._counter = count(1)
+        self._conn: AdbConnection | None = None
+        self._buffer = b""
+        self._lock = Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._conn is not None and not self._conn.closed
+
+    def _connect(self) -> None:
+        if not self.connected:
+            self._conn = self.device.open_shell("sh")
+            self._buffer = b""
+            logger.debug(f"{self.device.serial} 建立常驻 shell 连接")
+
+    def close(self) -> None:
+        """关闭连接，下次执行命令时自动重连"""
+        with self._lock:
+            self._close()
+
+    def _close(self) -> None:
+        if self._conn is not None:
+            self._conn.close()
+        self._conn = None
+        self._buffer = b""
+
+    def _frame(self, cmd: str) -> tuple[str, bytes]:
+        """为命令加上结束标记，命令的标准输入重定向为空，避免读走之后的命令
+        命令经 command eval 执行，引号不完整等语法错误只会让该命令失败，不会吞掉结束标记或退出 shell
+        """
+        marker = f"{self._prefix}{next(self._counter)}__"
+        script = f"command eval {quote(cmd)} </dev/null 2>&1\nprintf '\\n%s %d\\n' '{marker}' $?\n"
+        return script, marker.encode()
+
+    def _send(self, script: str, timeout: float) -> None:
+        """发送命令，连接已断开时重连一次
+        Raises:
+            ShellSendError: 命令没有发出任何内容，设备上不会执行
+            ConnectionError: 只发出了一部分，无法确定设备上是否执行
+        """
+        data = script.encode()
+        for retry in (True, False):
+            sent = 0
+            try:
+                self._connect()
+                self._conn.conn.settimeout(timeout)
+                while sent < len(data):
+                    sent += self._conn.conn.send(data[sent:])
+                return
+            except (OSError, AdbError) as e:
+                self._close()
+                if sent:
+                    raise ConnectionError(f"命令只发送了一部分 {e}") from e
+                if not retry:
+                    raise ShellSendError(f"命令未能发送 {e}") from e
+
+    def _read(self, marker: bytes) -> tuple[str, int]:
+        """读取到结束标记为止，返回命令输出与退出码"""
+        pattern = re.compile(rb"\r?\n" + re.escape(marker) + rb" (\d+)\r?\n")
+        while not (match := pattern.search(self._buffer)):
+            data = self._conn.conn.recv(65536)
+            if not data:
+                raise ConnectionError("shell 连接已关闭")
+            self._buffer += data
+
+        output = self._buffer[:match.start()]
+        self._buffer = self._buffer[match.end():]
+        return output.decode("utf-8", "replace").replace("\r\n", "\n"), int(match.group(1))
+
+    def run_many(self, cmds: list[str], timeout: float = None) -> list[tuple[str, int]]:
+        """一次发送多条命令，再依次读取各自的结果
+        Args:
+            cmds (list[str]): 命令列表
+            timeout (float, optional): 等待每次读取的超时时间 (秒)，默认使用初始化时的设置
+        Returns:
+            list[tuple[str, int]]: 每条命令的 (输出, 退出码)
+        Raises:
+            ShellSendError: 命令未能发送，可以改用其他方式重新执行
+            OSError: 命令已发送但读取结果失败或超时，不应重新执行
+        """
+        if not cmds:
+            return []
+
+        with self._lock:
+            frames = [self._frame(cmd) for cmd in cmds]
+            self._send("".join(script for script, _ in frames), timeout or self.timeout)
+            try:
+                return [self._read(marker) for _, marker in frames]
+            except Exception:
+                # 无法确定剩余输出属于哪条命令，丢弃连接
+                self._close()
+                raise
+
+    def run(self, cmd: str, timeout: float = None) -> str:
+        """执行一条命令并返回输出"""
+        return self.run_many([cmd], timeout)[0][0]
@@ -0,0 +1,201 @@
+import re
+
+EV_SYN = 0x00
+EV_KEY = 0x01
+EV_ABS = 0x03
+SYN_REPORT = 0x00
+SYN_MT_REPORT = 0x02
+BTN_TOUCH = 0x14a
+ABS_MT_SLOT = 0x2f
+ABS_MT_TOUCH_MAJOR = 0x30
+ABS_MT_POSITION_X = 0x35
+ABS_MT_POSITION_Y = 0x36
+ABS_MT_TRACKING_ID = 0x39
+ABS_MT_PRESSURE = 0x3a
+
+_DEVICE = re.compile(r"add device \d+: (\S+)")
+_NAME = re.compile(r'name:\s+"(.*)"')
+_ABS = re.compile(r"([0-9a-f]{4})\s*:\s*value -?\d+, min (-?\d+), max (-?\d+)")
+_KEY = re.compile(r"KEY \(0001\):([0-9a-f\s]+)")
+
+Path = list[tuple[float, float]]
+
+class TouchScreen:
+    """getevent 中发现的触摸屏输入设备"""
+    def __init__(self, path: str, name: str, ranges: dict[int, tuple[int, int]], keys: set[int]):
+        self.path = path
+        self.name = name
+        self.ranges = ranges
+        """ABS 事件代码 -> (最小值, 最大值)"""
+        self.keys = keys
+
+    @property
+    def slots(self) -> bool:
+        """是否支持多点触控 B 协议 (slot)"""
+        return ABS_MT_SLOT in self.ranges
+
+    @property
+    def max_fingers(self) -> int:
+        return self.ranges[ABS_MT_SLOT][1] + 1 if self.slots else 10
+
+    def __str__(self):
+        return f"触摸屏 {self.name} {self.path}"
+
+def parse_getevent(output: str) -> list[TouchScreen]:
+    """解析 getevent -p 的输出，返回支持多点触控坐标的输入设备，名称含 touch 的排在前面
+    Args:
+        output (str): getevent -p 的输出
+    Returns:
+        list[TouchScreen]: 触摸屏列表
+    """
+    screens = []
+    for block in re.split(r"(?=add device )", output):
+        if not (device := _DEVICE.search(block)):
+            continue
+
+        ranges = {int(code, 16): (int(low), int(high)) for code, low, high in _ABS.findall(block)}
+        if ABS_MT_POSITION_X not in ranges or ABS_MT_POSITION_Y not in ranges:
+            continue
+
+        keys = set()
+        if key := _KEY.search(block):
+            keys = {int(code, 16) for code in key.group(1).split()}
+        name = _NAME.search(block)
+        screens.append(TouchScreen(device.group(1), name.group(1) if name else "", ranges, keys))
+
+    return sorted(screens, key=lambda screen: "touch" not in screen.name.lower())
+
+def parse_rotation(output: str) -> int:
+    """从 dumpsys input 的输出中解析屏幕方向 (0-3)"""
+    if match := re.search(r"SurfaceOrientation:\s*(\d)", output):
+        return int(match.group(1))
+    if match := re.search(r"orientation=ROTATION_(\d+)", output):
+        return int(match.group(1)) // 90 % 4
+    return 0
+
+def interpolate(path: Path, samples: int) -> Path:
+    """将折线按长度均匀插值为 samples + 1 个点"""
+    if len(path) == 1:
+        return list(path) * (samples + 1)
+
+    lengths = [0.0]
+    for (x1, y1), (x2, y2) in zip(path, path[1:]):
+        lengths.append(lengths[-1] + ((x2 - x1) ** 2 + (y2 - y1) ** 2) ** 0.5)
+    total = lengths[-1] or 1.0
+
+    points = []
+    segment = 0
+    for index in range(samples + 1):
+        distance = total * index / samples
+        while segment < len(path) - 2 and lengths[segment + 1] < distance:
+            segment += 1
+        span = lengths[segment + 1] - lengths[segment] or 1.0
+        ratio = min(max((distance - lengths[segment]) / span, 0.0), 1.0)
+        (x1, y1), (x2, y2) = path[segment], path[segment + 1]
+        points.append((x1 + (x2 - x1) * ratio, y1 + (y2 - y1) * ratio))
+    return points
+
+class SendeventTouch:
+    """通过 sendevent 直接向触摸屏写入多点触控事件，生成可一次执行的 shell 脚本
+    sendevent 是原生程序，启动开销远小于需要启动 Java 进程的 input 命令
+    """
+    def __init__(self, screen: TouchScreen, size: tuple[int, int], rotation: int = 0, rate: int = 30):
+        """
+        Args:
+            screen (TouchScreen): 触摸屏
+            size (tuple[int, int]): 屏幕自然方向 (竖屏) 的分辨率 (宽, 高)
+            rotation (int, optional): 当前屏幕方向 0-3
+            rate (int, optional): 滑动时每秒发送的坐标数量
+        """
+        self.screen = screen
+        self.size = size
+        self.rotation = rotation
+        self.rate = rate
+        self._tracking_id = 0
+
+    def _to_touch(self, x: float, y: float) -> tuple[int, int]:
+        """将截图坐标转换为触摸屏坐标，考虑屏幕旋转"""
+        width, height = self.size
+        if self.rotation == 1:
+            x, y = width - y, x
+        elif self.rotation == 2:
+            x, y = width - x, height - y
+        elif self.rotation == 3:
+            x, y = y, height - x
+
+        x_min, x_max = self.screen.ranges[ABS_MT_POSITION_X]
+        y_min, y_max = self.screen.ranges[ABS_MT_POSITION_Y]
+        touch_x = x_min + round(min(max(x, 0), width) * (x_max - x_min) / width)
+        touch_y = y_min + round(min(max(y, 0), height) * (y_max - y_min) / height)
+        return touch_x, touch_y
+
+    def _event(self, event_type: int, code: int, value: int) -> str:
+        return f"sendevent {self.screen.path} {event_type} {code} {value}"
+
+    def _frame(self, fingers: dict[int, tuple[float, float] | None], first: bool, last: bool) -> list[str]:
+        """生成一次同步的事件，fingers 为 手指序号 -> 坐标，抬起时为 None"""
+        events = []
+        if self.screen.slots:
+            for finger, point in fingers.items():
+                events.append(self._event(EV_ABS, ABS_MT_SLOT, finger))
+                if last:
+                    events.append(self._event(EV_ABS, ABS_MT_TRACKING_ID, -1))
+                    continue
+                if first:
+                    self._tracking_id = (self._tracking_id + 1) % 0xffff
+                    events.append(self._event(EV_ABS, ABS_MT_TRACKING_ID, self._tracking_id))
+                touch_x, touch_y = self._to_touch(*point)
+                events.append(self._event(EV_ABS, ABS_MT_POSITION_X, touch_x))
+                events.append(self._event(EV_ABS, ABS_MT_POSITION_Y, touch_y))
+                if first and ABS_MT_PRESSURE in self.screen.ranges:
+                    events.append(self._event(EV_ABS, ABS_MT_PRESSURE, max(self.screen.ranges[ABS_MT_PRESSURE][1] // 2, 1)))
+                if first and ABS_MT_TOUCH_MAJOR in self.screen.ranges:
+                    events.append(self._event(EV_ABS, ABS_MT_TOUCH_MAJOR, max(self.screen.ranges[ABS_MT_TOUCH_MAJOR][1] // 4, 1)))
+        elif not last:
+            # A 协议每次同步都要报告全部手指
+            for finger, point in fingers.items():
+                touch_x, touch_y = self._to_touch(*point)
+                events.append(self._event(EV_ABS, ABS_MT_TRACKING_ID, finger))
+                events.append(self._event(EV_ABS, ABS_MT_POSITION_X, touch_x))
+                events.append(self._event(EV_ABS, ABS_MT_POSITION_Y, touch_y))
+                events.append(self._event(EV_SYN, SYN_MT_REPORT, 0))
+        else:
+            events.append(self._event(EV_SYN, SYN_MT_REPORT, 0))
+
+        if BTN_TOUCH in self.screen.keys and (first or last):
+            events.append(self._event(EV_KEY, BTN_TOUCH, 0 if last else 1))
+        events.append(self._event(EV_SYN, SYN_REPORT, 0))
+        return events
+
+    def gesture(self, paths: list[Path], duration: float, rate: int = None) -> str:
+        """生成多指手势脚本，所有手指同时按下、沿各自的折线移动并同时抬起
+        Args:
+            paths (list[Path]): 每根手指经过的坐标
+            duration (float): 手势时长 (秒)
+            rate (int, optional): 每秒发送的坐标数量，默认使用初始化时的设置
+        Returns:
+            str: shell 脚本
+        """
+        if not paths or len(paths) > self.screen.max_fingers:
+            raise ValueError(f"手指数量 {len(paths)} 超出触摸屏支持的范围 1-{self.screen.max_fingers}")
+
+        samples = max(int(duration * (rate or self.rate)), 1)
+        tracks = [interpolate([point.to_tuple() if hasattr(point, "x") else tuple(point) for point in path], samples) for path in paths]
+        interval = duration / samples
+
+        lines = []
+        for index in range(samples + 1):
+            fingers = {finger: track[index] for finger, track in enumerate(tracks)}
+            lines.extend(self._frame(fingers, first=index == 0, last=False))
+            if interval > 0 and index < samples:
+                lines.append(f"sleep {interval:.3f}")
+        lines.extend(self._frame({finger: None for finger in range(len(tracks))}, first=False, last=True))
+        return "\n".join(lines)
+
+    def tap(self, x: float, y: float, duration: float = 0.05) -> str:
+        """生成点击脚本"""
+        return self.gesture([[(x, y)]], duration, rate=1)
+
+    def swipe(self, x1: float, y1: float, x2: float, y2: float, duration: float) -> str:
+        """生成单指滑动脚本"""
+        return self.gesture([[(x1, y1), (x2, y2)]], duration)
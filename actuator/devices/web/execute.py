@@ -7,6 +7,7 @@ from selenium.webdriver.remote.webdriver import WebDriver
 from pathlib import Path
 from typing import Union
 
+from base import Devices
 from log import logger
 from config import get_config, PATH_WORKING
 from model import Tip, Image
@@ -44,9 +45,9 @@ def switch_to_frame_with_element(driver: WebDriver, by: By, value: str) -> bool:
     
     return False
 
-class WebDevice:
+class WebDevice(Devices):
     def __init__(self, name: str, driver_path: Path) -> None:
-        self.name = name
+        super().__init__(name)
         self.screenshot_file: bytes = b""
         self.pages: dict = {}
         self.driver_path = driver_path
@@ -222,13 +223,14 @@ class WebDevice:
         
         try:
             self.screenshot_file = self.browser.get_screenshot_as_png()
+            self._track_frame(self.get_screenshot())
             
             if save_object:
                 with open(save_object, 'wb') as file:
                     file.write(self.screenshot_file)
-                    return Tip(f"对 {self.browser.title} 的截图并保存到了 {save_object}"), self.get_screenshot()
+                return Tip(f"对 {self.browser.title} 的截图并保存到了 {save_object}"), self.get_screenshot()
 
-                return Tip(f"对 {self.browser.title} 进行截图并保存到内存"), self.get_screenshot()
+            return Tip(f"对 {self.browser.title} 进行截图并保存到内存"), self.get_screenshot()
             
         except Exception as e:
             logger.warning(f"无法截图，请检查设备状态。错误信息: {e}")
@@ -17,6 +17,7 @@ from model import Tip, Image
 import psutil
 import subprocess
 import threading
+import numpy as np
 
 LEFT = "left"
 MIDDLE = "middle"
@@ -306,24 +307,50 @@ class WindowsDevice(Devices):
     def get_all_windows_titles(self):
         return gw.getAllTitles()
     
+    def batch(self, steps: list) -> Tip:
+        """依次执行一组点击、滑动、按键与等待，期间取消 pyautogui 每次操作后的默认停顿，由等待步骤控制节奏
+        Args:
+            steps (list): 手势列表，如 {{"tap", 100, 200}, {"sleep", 0.05}, {"swipe", 100, 200, 300, 400, 0.2}, {"key", "enter"}}
+        """
+        pauses = pyautogui.PAUSE, pydirectinput.PAUSE
+        pyautogui.PAUSE = pydirectinput.PAUSE = 0
+        try:
+            return super().batch(steps)
+        finally:
+            pyautogui.PAUSE, pydirectinput.PAUSE = pauses
+    
     def get_screenshot(self) -> Image:
+        if (image := self._stream_image()) is not None:
+            return image
         return Image(self.screenshot_file.getvalue())
     
+    def _capture(self) -> Image:
+        """截图并直接转换为 BGR 像素数组，不进行 PNG 编码"""
+        screenshot = pyautogui.screenshot().convert("RGB")
+        return Image.from_array(np.asarray(screenshot)[:, :, ::-1].copy())
+    
     def screenshot(self, filePath: Path= None):
         save_object = None
         
-        self.screenshot_file.seek(0)
-        self.screenshot_file.truncate(0)
-        
         if get_config().save_screenshot:
             save_object = PATH_WORKING / "windows.png"
         
         if filePath:
             save_object = filePath
         
+        if filePath is None and (image := self._stream_image()) is not None:
+            if save_object:
+                image.save(save_object)
+                return Tip(f"Windows 持续截图中，返回最新的一帧并保存到了 {save_object}"), image
+            return Tip(f"Windows 持续截图中，返回最新的一帧"), image
+        
+        self.screenshot_file.seek(0)
+        self.screenshot_file.truncate(0)
+        
         try:
             screenshot = pyautogui.screenshot()
             screenshot.save(self.screenshot_file, format= "PNG")
+            self._track_frame(self.get_screenshot())
             
             if save_object:
                 screenshot.save(save_object, format=screenshot.format)
@@ -1,7 +1,9 @@
 from pathlib import Path
 from io import BytesIO
 
-from PIL import Image as PILImage, ImageDraw as PILImageDraw, ImageColor as PILImageColor
+from PIL import Image as PILImage, ImageColor as PILImageColor
+import cv2
+import numpy as np
 
 class Tip:
     """返回的提示"""
@@ -32,10 +34,58 @@ class Point:
     def to_list(self) -> tuple[int, int]:
         return [self.x, self.y]
 
+def _to_rgb(color: str) -> tuple[int, int, int]:
+    """将颜色代码转换为 RGB"""
+    return PILImageColor.getrgb(color)[:3]
+
 class Image:
-    def __init__(self, image_bytes: bytes = b""):
+    """图片，编码数据与解码后的像素数组按需相互转换并缓存"""
+    def __init__(self, image_bytes: bytes = b"", array: np.ndarray = None):
+        """
+        Args:
+            image_bytes (bytes, optional): 编码后的图片数据 (PNG、JPG 等)
+            array (np.ndarray, optional): 解码后的 BGR 像素数组
+        """
         self._image_bytes: bytes = image_bytes
+        self._array: np.ndarray | None = array
+        self._gray: np.ndarray | None = None
         self.name: str = None
+        self.offset: tuple[int, int] = (0, 0)
+        """图片左上角在原始截图中的坐标，裁切得到的图片不为 (0, 0)"""
+
+    @classmethod
+    def from_array(cls, array: np.ndarray, name: str = None) -> 'Image':
+        """由 BGR 像素数组创建图片，需要编码数据时才会编码为 PNG"""
+        image = cls(array=array)
+        image.name = name
+        return image
+
+    def _set_array(self, array: np.ndarray, gray: np.ndarray = None) -> None:
+        self._array = array
+        self._gray = gray
+        self._image_bytes = b""
+
+    @property
+    def encoded(self) -> bool:
+        """是否已有编码数据"""
+        return bool(self._image_bytes)
+
+    @property
+    def array(self) -> np.ndarray:
+        """BGR 像素数组，首次访问时解码并缓存"""
+        if self._array is None:
+            array = cv2.imdecode(np.frombuffer(self._image_bytes, np.uint8), cv2.IMREAD_COLOR)
+            if array is None:
+                raise ValueError("无法解码图片")
+            self._array = array
+        return self._array
+
+    @property
+    def gray(self) -> np.ndarray:
+        """灰度像素数组，首次访问时转换并缓存"""
+        if self._gray is None:
+            self._gray = cv2.cvtColor(self.array, cv2.COLOR_BGR2GRAY)
+        return self._gray
 
     def open(self, path: Path) -> 'Image':
         """打开图片
@@ -43,36 +93,63 @@ class Image:
             path (Path): 路径
         """
         self.name = path.name
-        with PILImage.open(path) as img:
-            byte_arr = BytesIO()
-            img.save(byte_arr, format=img.format)
-            self._image_bytes = byte_arr.getvalue()
-            
-            image = Image(byte_arr.getvalue())
-            image.name = self.name
+        self._image_bytes = Path(path).read_bytes()
+        self._array = None
+        self._gray = None
+        
+        image = Image(self._image_bytes)
+        image.name = self.name
             
         return image
 
-    def crop(self, image_bytes: bytes, x1: int, y1: int, x2: int, y2: int) -> 'Image':
+    def view(self, x1: int, y1: int, x2: int, y2: int) -> 'Image':
+        """裁切图片，与原图共享像素数组而不复制，需要编码数据时才会编码
+        Args:
+            x1 (int): 裁切的坐标 x1
+            y1 (int): 裁切的坐标 y1
+            x2 (int): 裁切的坐标 x2
+            y2 (int): 裁切的坐标 y2
+        Returns:
+            Image: 裁切后的图片，offset 为其在原始截图中的位置
+        """
+        height, width = self.array.shape[:2]
+        x1, x2 = max(0, min(x1, x2)), min(width, max(x1, x2))
+        y1, y2 = max(0, min(y1, y2)), min(height, max(y1, y2))
+
+        image = Image.from_array(self._array[y1:y2, x1:x2], self.name)
+        if self._gray is not None:
+            image._gray = self._gray[y1:y2, x1:x2]
+        image.offset = (self.offset[0] + x1, self.offset[1] + y1)
+        return image
+
+    def crop(self, image_bytes: 'bytes | Image', x1: int, y1: int, x2: int, y2: int) -> 'Image':
         """裁切图片
         Args:
-            image_bytes (bytes): 图片原始数据
+            image_bytes (bytes | Image): 图片原始数据或图片
             x1 (int): 裁切的坐标 x1
             y1 (int): 裁切的坐标 y1
             x2 (int): 裁切的坐标 x2
             y2 (int): 裁切的坐标 y2
         """
-        output_buffer = BytesIO()
-        img = PILImage.open(BytesIO(image_bytes))
-        cropped_img = img.crop((x1, y1, x2, y2))
-        cropped_img.save(output_buffer, format="PNG")
-        self._image_bytes = output_buffer.getvalue()
-        
-        image = Image(output_buffer.getvalue())
-        image.name = self.name
+        source = Image(image_bytes) if isinstance(image_bytes, (bytes, bytearray)) else image_bytes
+        image = source.view(x1, y1, x2, y2)
+        self._set_array(image.array, image._gray)
+        self.offset = image.offset
         
         return image
 
+    def to_screen(self, points: 'Point | list[Point]') -> 'Point | list[Point]':
+        """将图片内的坐标转换为原始截图中的坐标
+        Args:
+            points (Point | list[Point]): 该图片内的坐标，例如在图片中自行计算的像素位置，模板匹配与文字识别的结果已是原始截图中的坐标，无需转换
+        Returns:
+            Point | list[Point]: 原始截图中的坐标
+        """
+        offset_x, offset_y = self.offset
+        if hasattr(points, "x"):
+            return Point(x= points.x + offset_x, y= points.y + offset_y)
+        return [Point(x= point.x + offset_x, y= point.y + offset_y) for point in points]
+
     def fill_color(self, x1: int, y1: int, x2: int, y2: int, color: str) -> 'Image':
         """填充色块
         Args:
@@ -82,15 +159,13 @@ class Image:
             y2 (int): 右下角 y 坐标
             color (str): 16进制颜色代码，如 "#FF0000" 表示红色
         """
-        img = PILImage.open(BytesIO(self._image_bytes))
-        draw = PILImageDraw.Draw(img)
-        draw.rectangle([x1, y1, x2, y2], fill=color)
-        output_buffer = BytesIO()
-        img.save(output_buffer, format="PNG")
-        self._image_bytes = output_buffer.getvalue()
+        red, green, blue = _to_rgb(color)
+        filled = self.array.copy()
+        filled[min(y1, y2): max(y1, y2) + 1, min(x1, x2): max(x1, x2) + 1] = (blue, green, red)
+        self._set_array(filled)
         
-        image = Image(output_buffer.getvalue())
-        image.name = self.name
+        image = Image.from_array(filled, self.name)
+        image.offset = self.offset
         
         return image
 
@@ -103,18 +178,63 @@ class Image:
         Returns:
             bool: 如果该点的颜色与指定颜色匹配，返回 True，否则返回 False
         """
-        img = PILImage.open(BytesIO(self._image_bytes))
-        pixel_color = img.getpixel((x, y))
-        expected_color = PILImageColor.getrgb(color)
-        return pixel_color == expected_color
+        blue, green, red = self.array[y, x]
+        return (int(red), int(green), int(blue)) == _to_rgb(color)
+
+    def _pixels(self, points: 'list[Point | tuple[int, int]]') -> np.ndarray:
+        """一次取出多个像素点的 BGR 颜色"""
+        coords = np.array([point.to_tuple() if hasattr(point, "x") else tuple(point)[:2] for point in points], dtype=np.intp).reshape(-1, 2)
+        return self.array[coords[:, 1], coords[:, 0]].astype(np.int16)
+
+    def check_colors(self, points: 'list[Point | tuple[int, int]]', colors: 'str | list[str]', tolerance: int = 0) -> list[bool]:
+        """一次判断多个像素点的颜色，只访问一次像素数组
+        Args:
+            points (list[Point | tuple[int, int]]): 像素点坐标列表
+            colors (str | list[str]): 与坐标一一对应的16进制颜色代码，传入单个颜色时所有点使用同一颜色
+            tolerance (int, optional): 每个通道允许的最大差值
+        Returns:
+            list[bool]: 每个点的颜色是否匹配
+        """
+        colors = [colors] * len(points) if isinstance(colors, str) else list(colors)
+        if len(colors) != len(points):
+            raise ValueError(f"坐标数量 {len(points)} 与颜色数量 {len(colors)} 不一致")
+        if not points:
+            return []
+
+        expected = np.array([_to_rgb(color)[::-1] for color in colors], dtype=np.int16)
+        return (np.abs(self._pixels(points) - expected).max(axis=1) <= tolerance).tolist()
+
+    def get_colors(self, points: 'list[Point | tuple[int, int]]') -> list[str]:
+        """获取多个像素点的颜色
+        Args:
+            points (list[Point | tuple[int, int]]): 像素点坐标列表
+        Returns:
+            list[str]: 16进制颜色代码列表，如 "#FF0000"
+        """
+        if not points:
+            return []
+        return [f"#{red:02X}{green:02X}{blue:02X}" for blue, green, red in self._pixels(points).tolist()]
+
+    def pixel_signature(self, points: 'list[Point | tuple[int, int]]', step: int = 32) -> str:
+        """计算多个像素点颜色的签名，用于快速判断当前界面
+        颜色按 step 量化后拼接，轻微的颜色抖动不会改变签名
+        Args:
+            points (list[Point | tuple[int, int]]): 像素点坐标列表
+            step (int, optional): 颜色量化的步长
+        Returns:
+            str: 签名字符串，界面相同时签名相同
+        """
+        if not points:
+            return ""
+        quantized = ((self._pixels(points) + step // 2) // step).clip(0, 255).astype(np.uint8)
+        return quantized.tobytes().hex()
 
     def get_resolution(self) -> tuple[int, int]:
         """获取图像的分辨率（宽度和高度）。
         Returns:
             tuple[int, int]: 图片分辨率
         """
-        img = PILImage.open(BytesIO(self._image_bytes))
-        return img.size
+        return self.resolution
 
     @property
     def resolution(self) -> tuple[int, int]:
@@ -122,15 +242,30 @@ class Image:
         Returns:
             tuple[int, int]: 图片分辨率
         """
-        img = PILImage.open(BytesIO(self._image_bytes))
-        return img.size
+        if self._array is not None:
+            height, width = self._array.shape[:2]
+            return width, height
+        
+        # 未解码时只读取文件头
+        with PILImage.open(BytesIO(self._image_bytes)) as img:
+            return img.size
 
     @property
     def image_bytes(self) -> bytes:
+        """编码后的图片数据，只有像素数组时编码为 PNG 并缓存"""
+        if not self._image_bytes and self._array is not None:
+            self._image_bytes = cv2.imencode(".png", self._array)[1].tobytes()
         return self._image_bytes
 
+    def save(self, path: Path) -> None:
+        """保存图片
+        Args:
+            path (Path): 路径
+        """
+        Path(path).write_bytes(self.image_bytes)
+
     def __str__(self):
         try:
             return f"图片 {self.name if self.name else '未命名'} 分辨率 {self.resolution}"
         except:
-            return "图片损坏"
\ No newline at end of file
+            return "图片损坏"
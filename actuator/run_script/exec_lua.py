@@ -1,23 +1,48 @@
 from pathlib import Path
+from threading import Event
 from typing import Callable, Union, Any
 import time
 
-from lupa.lua54 import LuaRuntime, LuaError
+from lupa.lua54 import LuaRuntime, LuaError, lua_type
 from log import logger
+from config import get_config
 
-from model import Tip, Image
+from model import Tip, Image, Point
 from utils.requests import Requests
 from utils.image import (
     image_ocr,
+    image_ocr_regions,
+    image_ocr_detect,
+    image_ocr_recognize,
+    ocr_index,
+    find_all_text,
+    find_many_text,
+    nearest_text,
+    texts_in_rect,
+    batched_image_ocr,
+    ocr_result_cache,
     exact_match,
     simple_fuzzy_match,
     fuzzy_match,
+    fuzzy_match_top,
+    fuzzy_match_many,
     regex_match,
     template_matching,
+    region_template_matching,
+    near_template_matching,
+    color_template_matching,
+    multi_template_matching,
+    first_template_matching,
     diff_size_template_matching,
+    feature_matching,
+    feature_matching_corners,
+    diff_regions,
+    template_registry,
+    Template,
 )
 from utils.method import dynamic_call
-from consts import devices_manager
+from utils import wait
+from consts import devices_manager, cancel_events
 
 
 class VirtualFile:
@@ -66,26 +91,37 @@ class LuaPath:
 
 
 def python_2_lua(lua_runtime: LuaRuntime, data: Any) -> Any:
-    """Python对象转Lua表格"""
+    """Python对象转Lua表格，嵌套的列表与字典一并转换"""
     if isinstance(data, (tuple, list, set)):
         table = lua_runtime.table()
         for i, item in enumerate(data, start=1):
-            table[i] = item
+            table[i] = python_2_lua(lua_runtime, item)
         return table
 
     if isinstance(data, dict):
         table = lua_runtime.table()
         for key, value in data.items():
-            table[key] = value
+            table[key] = python_2_lua(lua_runtime, value)
         return table
 
     return data
 
 
+def lua_2_python(data: Any) -> Any:
+    """Lua表格转Python对象，连续整数键转为列表，其余转为字典"""
+    if lua_type(data) != "table":
+        return data
+
+    items = {key: lua_2_python(value) for key, value in data.items()}
+    if list(items.keys()) == list(range(1, len(items) + 1)):
+        return list(items.values())
+    return items
+
+
 def output_fix(lua_runtime: LuaRuntime, func: Callable) -> Callable:
-    """返回值自动转换装饰器"""
+    """参数与返回值自动转换装饰器"""
     def wrapper(*args):
-        results = func(*args)
+        results = func(*(lua_2_python(arg) for arg in args))
         return python_2_lua(lua_runtime, results)
     return wrapper
 
@@ -93,7 +129,7 @@ def output_fix(lua_runtime: LuaRuntime, func: Callable) -> Callable:
 def output_result(output: Callable, func: Callable, lua_runtime: LuaRuntime) -> Callable:
     """输出结果处理装饰器"""
     def wrapper(*args):
-        results = dynamic_call(func, args)
+        results = dynamic_call(func, tuple(lua_2_python(arg) for arg in args))
 
         if isinstance(results, tuple):
             tips = []
@@ -109,13 +145,14 @@ def output_result(output: Callable, func: Callable, lua_runtime: LuaRuntime) ->
 
             if not other_results:
                 return None
-            return other_results[0] if len(other_results) == 1 else python_2_lua(lua_runtime, other_results)
+            return python_2_lua(lua_runtime, other_results[0] if len(other_results) == 1 else other_results)
 
         if isinstance(results, Tip):
             output(results)
             return None
 
-        return results
+        # 列表与字典转为 Lua 表，下标从 1 开始
+        return python_2_lua(lua_runtime, results)
     return wrapper
 
 
@@ -149,17 +186,53 @@ class LuaImage(Image):
         super().__init__()
         self.path = path
         self.lua_runtime = lua_runtime
+        config = get_config()
+        ocr_batch = config.extra.get("ocr_batch", False) if config else False
         self.function_maps = {
-            "ocr": image_ocr,
+            "ocr": batched_image_ocr if ocr_batch else image_ocr,
+            "batch_ocr": batched_image_ocr,
+            "ocr_regions": image_ocr_regions,
+            "ocr_detect": image_ocr_detect,
+            "ocr_recognize": image_ocr_recognize,
+            "ocr_index": ocr_index,
+            "find_all_text": find_all_text,
+            "find_many_text": find_many_text,
+            "nearest_text": nearest_text,
+            "texts_in_rect": texts_in_rect,
+            "ocr_cache_stats": ocr_result_cache.stats,
+            "ocr_cache_clear": ocr_result_cache.clear,
             "exact_match": exact_match,
             "simple_fuzzy_match": simple_fuzzy_match,
             "fuzzy_match": fuzzy_match,
+            "fuzzy_match_top": fuzzy_match_top,
+            "fuzzy_match_many": fuzzy_match_many,
             "regex_match": regex_match,
             "template_matching": template_matching,
+            "region_template_matching": region_template_matching,
+            "near_template_matching": near_template_matching,
+            "color_template_matching": color_template_matching,
+            "multi_template_matching": multi_template_matching,
+            "first_template_matching": first_template_matching,
             "diff_size_template_matching": diff_size_template_matching,
+            "feature_matching": feature_matching,
+            "feature_matching_corners": feature_matching_corners,
+            "diff_regions": diff_regions,
+            "register_template": self._register_template,
             "open": self._open,
             "crop": self.crop,
+            "view": Image.view,
+            "to_screen": Image.to_screen,
+            "check_color": Image.check_color,
+            "check_colors": Image.check_colors,
+            "get_colors": Image.get_colors,
+            "pixel_signature": Image.pixel_signature,
         }
+        for name in (
+            "template_matching", "region_template_matching", "near_template_matching", "color_template_matching",
+            "multi_template_matching", "first_template_matching", "diff_size_template_matching",
+            "feature_matching", "feature_matching_corners",
+        ):
+            self.function_maps[name] = self._script_templates(self.function_maps[name])
 
     def _open(self, path: str) -> Image | None:
         """打开图像文件"""
@@ -167,6 +240,30 @@ class LuaImage(Image):
         _path = next((p for p in potential_paths if p.exists()), None)
         return self.open(_path) if _path else None
 
+    def _register_template(self, name: str, path: str) -> Template | None:
+        """注册模板，之后可直接用名称进行模板匹配"""
+        potential_paths = [Path(self.path, path), Path(path)]
+        _path = next((p for p in potential_paths if p.exists()), None)
+        return template_registry.register(name, _path) if _path else None
+
+    def _template(self, tmpl: Any) -> Any:
+        """模板名或文件路径转换为模板，相对路径优先在脚本目录下查找"""
+        return template_registry.resolve(tmpl, self.path) if isinstance(tmpl, str) else tmpl
+
+    def _script_templates(self, func: Callable) -> Callable:
+        """模板匹配函数的模板参数按脚本目录解析，与 wait_for_template 一致"""
+        def wrapper(image, templates, *args):
+            if isinstance(templates, dict):
+                templates = {name: self._template(tmpl) for name, tmpl in templates.items()}
+            elif isinstance(templates, list) and all(isinstance(tmpl, str) for tmpl in templates):
+                templates = {tmpl: self._template(tmpl) for tmpl in templates}
+            elif isinstance(templates, list):
+                templates = [self._template(tmpl) for tmpl in templates]
+            else:
+                templates = self._template(templates)
+            return func(image, templates, *args)
+        return wrapper
+
     def __getitem__(self, name: str) -> Any:
         """获取图像处理方法或属性"""
         if func := self.function_maps.get(name):
@@ -191,6 +288,8 @@ class LuaScriptRuntime:
         self.notify = notify
         self.lua: LuaRuntime | None = None
         self.path: Path | None = None
+        self.cancel_event = Event()
+        """设置后正在等待的 wait_for 系列函数立即返回，脚本运行期间登记在 cancel_events 中"""
 
     def output_handler(self, message: str = "") -> None:
         """输出处理器"""
@@ -221,6 +320,72 @@ class LuaScriptRuntime:
         if self.notify:
             self.notify(message)
 
+    def cancel(self) -> None:
+        """取消脚本中正在进行的等待"""
+        self.cancel_event.set()
+
+    def _device(self) -> Any:
+        if devices_manager.device is None:
+            raise LuaError("请先使用 select_device 选择设备!")
+        return devices_manager.device
+
+    def wait_for_text(self, text: str, timeout: float = 10.0, interval: float = 0.2, lang: str = "ch", cancel: Callable | None = None) -> Point | None:
+        """等待画面中出现指定文字
+        Args:
+            text (str): 目标文字，优先全词匹配，其次包含匹配
+            timeout (float): 超时时间 (秒)
+            interval (float): 初始的截图间隔 (秒)
+            lang (str): 识别语言
+            cancel (Callable | None): 返回真值时取消等待
+        Returns:
+            Point | None: 文字的中心点，超时时为 nil
+        """
+        config = get_config()
+        ocr = batched_image_ocr if config and config.extra.get("ocr_batch", False) else image_ocr
+        return wait.wait_for_text(self._device(), text, timeout, interval, lang, self.cancel_event, cancel, ocr)
+
+    def wait_for_template(self, tmpl: Any, timeout: float = 10.0, interval: float = 0.2, min_confidence: float = 0.93, cancel: Callable | None = None) -> Point | None:
+        """等待画面中出现模板
+        Args:
+            tmpl (Any): 模板图片、已注册的模板名或模板文件路径 (可相对脚本目录)
+            timeout (float): 超时时间 (秒)
+            interval (float): 初始的截图间隔 (秒)
+            min_confidence (float): 最小信心度
+            cancel (Callable | None): 返回真值时取消等待
+        Returns:
+            Point | None: 模板的中心点，超时时为 nil
+        """
+        template = template_registry.resolve(tmpl, self.path)
+        return wait.wait_for_template(self._device(), template, timeout, interval, min_confidence, self.cancel_event, cancel)
+
+    def wait_for_color(self, x: int, y: int, color: str, timeout: float = 10.0, interval: float = 0.2, tolerance: int = 0, cancel: Callable | None = None) -> bool:
+        """等待像素点变为指定颜色
+        Args:
+            x (int): 像素点的 x 坐标
+            y (int): 像素点的 y 坐标
+            color (str): 16进制颜色代码，如 "#FF0000"
+            timeout (float): 超时时间 (秒)
+            interval (float): 截图间隔 (秒)
+            tolerance (int): 每个通道允许的最大差值
+            cancel (Callable | None): 返回真值时取消等待
+        Returns:
+            bool: 超时前颜色是否匹配
+        """
+        return wait.wait_for_color(self._device(), x, y, color, timeout, interval, tolerance, self.cancel_event, cancel)
+
+    def wait_for_change(self, timeout: float = 10.0, interval: float = 0.2, threshold: int = 10, cancel: Callable | None = None) -> Any:
+        """等待画面发生变化
+        Args:
+            timeout (float): 超时时间 (秒)
+            interval (float): 初始的截图间隔 (秒)
+            threshold (int): 任一通道的差值超过该值视为变化
+            cancel (Callable | None): 返回真值时取消等待
+        Returns:
+            Any: 变化区域 {x1, y1, x2, y2} 的列表，超时时为 nil
+        """
+        regions = wait.wait_for_change(self._device(), timeout, interval, threshold, self.cancel_event, cancel)
+        return python_2_lua(self.lua, regions) if regions else None
+
     def set_updata_buffer_handler(self, handler: Callable) -> None:
         """设置缓冲区更新回调"""
         self.buffer.updata_buffer_handler = handler
@@ -242,6 +407,7 @@ class LuaScriptRuntime:
         self.path = Path(path).parent
         self.lua = LuaRuntime()
         self.buffer.clear()
+        self.cancel_event.clear()
 
         globals_table = self.lua.globals()
         
@@ -256,6 +422,10 @@ class LuaScriptRuntime:
         globals_table["python_buffer_file"] = self.buffer
         globals_table["sleep"] = self.sleep_handler
         globals_table["select_device"] = self.select_device
+        globals_table["wait_for_text"] = self.wait_for_text
+        globals_table["wait_for_template"] = self.wait_for_template
+        globals_table["wait_for_color"] = self.wait_for_color
+        globals_table["wait_for_change"] = self.wait_for_change
         globals_table["Device"] = LuaDevice(None, self.output_handler, self.lua)
         globals_table["Image"] = LuaImage(self.path, self.lua)
         globals_table["Requests"] = Requests
@@ -292,6 +462,7 @@ class LuaScriptRuntime:
     
     def run(self, script: str) -> str | Exception | None:
         """执行Lua脚本"""
+        cancel_events.append(self.cancel_event)
         try:
             result = self.lua.execute(script)
             if result not in [0, None]:
@@ -313,4 +484,7 @@ class LuaScriptRuntime:
             logger.debug("".join(traceback.format_exception(e)))
             self.output_handler("本程序异常!")
             self.output_handler(f"错误 {e if str(e) else '未知错误'}")
-            return e if str(e) else "未知错误"
\ No newline at end of file
+            return e if str(e) else "未知错误"
+
+        finally:
+            cancel_events.remove(self.cancel_event)
\ No newline at end of file
@@ -19,7 +19,7 @@ from run_script import LuaScriptRuntime, ScriptFileRuntime
 from config import get_config
 
 from typing import Callable
-from consts import threadings, devices_manager # TODO 实现多同类设备运行
+from consts import threadings, devices_manager, cancel_events # TODO 实现多同类设备运行
 
 class LogScreen(ModalScreen):
     DEFAULT_CSS = """
@@ -388,6 +388,9 @@ class RunScreen(Screen):
     def action_stop_tasks(self):
         for task in self.script_tasks.values():
             task.cancel() # 取消尚未开始的任务
+        
+        for event in cancel_events:
+            event.set() # 让正在等待的脚本立即返回
             
         for threading in threadings:
             thread_id = threading.ident
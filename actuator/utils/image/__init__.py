@@ -1,2 +1,8 @@
+from .template_registry import *
 from .tempate_matching import *
+from .feature_matching import *
+from .frame_change import *
+from .ocr_cache import *
+from .ocr_result import *
 from .image_ocr import *
+from .ocr_batch import *
\ No newline at end of file
@@ -0,0 +1,114 @@
+import cv2
+import numpy as np
+
+from model import Point, Image
+
+from .template_registry import Template, template_registry
+from .tempate_matching import TemplateLike
+
+_DETECTORS = {
+    "orb": lambda: cv2.ORB_create(nfeatures=1500),
+    "akaze": lambda: cv2.AKAZE_create(),
+}
+
+def _detector(method: str) -> cv2.Feature2D:
+    """创建特征点检测器，检测器不是线程安全的，每次调用单独创建"""
+    factory = _DETECTORS.get(method.lower())
+    if factory is None:
+        raise ValueError(f"不支持的特征点算法 {method}，可选 {', '.join(_DETECTORS)}")
+    return factory()
+
+def template_features(template: Template, method: str = "orb") -> tuple[tuple[cv2.KeyPoint, ...], np.ndarray | None]:
+    """获取模板的特征点与描述子，结果缓存在模板中
+    Args:
+        template (Template): 模板
+        method (str, optional): 特征点算法 orb 或 akaze
+    Returns:
+        tuple[tuple[cv2.KeyPoint, ...], np.ndarray | None]: 特征点与描述子
+    """
+    key = ("features", method.lower())
+    if key not in template.cache:
+        template.cache[key] = _detector(method).detectAndCompute(template.gray, None)
+    return template.cache[key]
+
+def _locate(
+    gray_img: np.ndarray,
+    template: Template,
+    method: str,
+    min_matches: int,
+    ratio: float,
+) -> np.ndarray | None:
+    """通过特征点匹配与单应性矩阵计算模板四个角在图片中的位置"""
+    tmpl_keypoints, tmpl_descriptors = template_features(template, method)
+    if tmpl_descriptors is None or len(tmpl_keypoints) < min_matches:
+        return None
+
+    img_keypoints, img_descriptors = _detector(method).detectAndCompute(gray_img, None)
+    if img_descriptors is None or len(img_keypoints) < min_matches:
+        return None
+
+    matcher = cv2.BFMatcher(cv2.NORM_HAMMING)
+    good = [
+        pair[0] for pair in matcher.knnMatch(tmpl_descriptors, img_descriptors, k=2)
+        if len(pair) == 2 and pair[0].distance < ratio * pair[1].distance
+    ]
+    if len(good) < min_matches:
+        return None
+
+    src = np.float32([tmpl_keypoints[match.queryIdx].pt for match in good]).reshape(-1, 1, 2)
+    dst = np.float32([img_keypoints[match.trainIdx].pt for match in good]).reshape(-1, 1, 2)
+    homography, inliers = cv2.findHomography(src, dst, cv2.RANSAC, 5.0)
+    if homography is None or int(inliers.sum()) < min_matches:
+        return None
+
+    h_tmpl, w_tmpl = template.shape
+    corners = np.float32([[0, 0], [w_tmpl, 0], [w_tmpl, h_tmpl], [0, h_tmpl]]).reshape(-1, 1, 2)
+    corners = cv2.perspectiveTransform(corners, homography).reshape(-1, 2)
+
+    # 投影后的四边形自相交或面积过小时视为误匹配
+    if not cv2.isContourConvex(corners.astype(np.int32)) or cv2.contourArea(corners) < 16:
+        return None
+    return corners
+
+def feature_matching(
+    image: Image,
+    tmpl: TemplateLike,
+    method: str = "orb",
+    min_matches: int = 10,
+    ratio: float = 0.75,
+) -> Point | None:
+    """通过特征点匹配查找模板，支持不同分辨率与旋转，无需多尺度遍历。
+
+    Args:
+        image (Image): 输入的图片，在该图片中查找模板图像。
+        tmpl (TemplateLike): 模板的图片、已注册的模板名或模板文件路径。
+        method (str, optional): 特征点算法 orb 或 akaze。默认为 orb。
+        min_matches (int, optional): 至少需要的匹配特征点数量。默认为10。
+        ratio (float, optional): 最近邻比值检验的阈值。默认为0.75。
+
+    Returns:
+        Point | None: 模板中心在原始截图中的坐标，未找到时为 None。
+    """
+
+    corners = _locate(image.gray, template_registry.resolve(tmpl), method, min_matches, ratio)
+    if corners is None:
+        return None
+    corners = corners + image.offset
+
+    center_x, center_y = corners.mean(axis=0)
+    return Point(x= int(center_x), y= int(center_y))
+
+def feature_matching_corners(
+    image: Image,
+    tmpl: TemplateLike,
+    method: str = "orb",
+    min_matches: int = 10,
+    ratio: float = 0.75,
+) -> list[Point]:
+    """通过特征点匹配查找模板，返回模板四个角 (左上、右上、右下、左下) 在原始截图中的坐标，参数同 feature_matching。"""
+
+    corners = _locate(image.gray, template_registry.resolve(tmpl), method, min_matches, ratio)
+    if corners is None:
+        return []
+    corners = corners + image.offset
+    return [Point(x= int(x), y= int(y)) for x, y in corners]
@@ -0,0 +1,144 @@
+from collections import OrderedDict
+from threading import Lock
+
+import cv2
+import numpy as np
+
+from model import Image
+
+Region = tuple[int, int, int, int]
+
+def thumbnail(image: Image, width: int = 96) -> np.ndarray:
+    """将图片缩小为灰度缩略图，缩小时取区域平均，可忽略噪点
+    Args:
+        image (Image): 输入的图片
+        width (int, optional): 缩略图宽度，高度按比例计算
+    Returns:
+        np.ndarray: 灰度缩略图
+    """
+    gray = image.gray
+    h_img, w_img = gray.shape
+    height = max(round(width * h_img / w_img), 1)
+    return cv2.resize(gray, (width, height), interpolation=cv2.INTER_AREA)
+
+def _dirty_regions(before: np.ndarray, after: np.ndarray, resolution: tuple[int, int], threshold: int) -> list[Region]:
+    """比较两张缩略图，返回变化区域在原图中的坐标，彩色图取各通道中最大的差值"""
+    diff = cv2.absdiff(before, after)
+    if diff.ndim == 3:
+        diff = diff.max(axis=2)
+    mask = (diff > threshold).astype(np.uint8)
+    if not mask.any():
+        return []
+
+    mask = cv2.dilate(mask, np.ones((3, 3), np.uint8))
+    count, _, stats, _ = cv2.connectedComponentsWithStats(mask, connectivity=8)
+
+    w_img, h_img = resolution
+    scale_x, scale_y = w_img / mask.shape[1], h_img / mask.shape[0]
+    regions = []
+    for x, y, w, h, _ in stats[1:count]:
+        regions.append((
+            int(x * scale_x), int(y * scale_y),
+            min(int(np.ceil((x + w) * scale_x)), w_img), min(int(np.ceil((y + h) * scale_y)), h_img),
+        ))
+    return sorted(regions, key=lambda region: (region[1], region[0]))
+
+def diff_regions(image1: Image, image2: Image, threshold: int = 10, full: bool = False) -> list[Region]:
+    """
+    比较两张图片，返回发生变化的区域。
+
+    Args:
+        image1 (Image): 之前的图片。
+        image2 (Image): 之后的图片。
+        threshold (int, optional): 缩略图灰度差超过该值视为变化。默认为10。
+        full (bool, optional): 在原始分辨率下逐通道比较，可发现细小或只改变色相的变化。默认为False。
+
+    Returns:
+        list[tuple[int, int, int, int]]: 变化区域 (x1, y1, x2, y2) 列表，未变化时为空。
+    """
+
+    if image1.resolution != image2.resolution:
+        width, height = image2.resolution
+        return [(0, 0, width, height)]
+    if full:
+        return _dirty_regions(image1.array, image2.array, image2.resolution, threshold)
+    return _dirty_regions(thumbnail(image1), thumbnail(image2), image2.resolution, threshold)
+
+class FrameChangeDetector:
+    """记录设备的截图，判断画面自某一帧之后是否变化以及变化的区域
+    只在查询时才计算缩略图，不查询时截图没有额外开销
+    """
+    def __init__(self, threshold: int = 10, history: int = 16):
+        """
+        Args:
+            threshold (int, optional): 缩略图灰度差超过该值视为变化
+            history (int, optional): 保留缩略图的帧数，更早的令牌视为画面已变化
+        """
+        self.threshold = threshold
+        self.history = history
+        self._index = 0
+        self._image: Image | None = None
+        self._thumbnails: OrderedDict[int, np.ndarray] = OrderedDict()
+        self._resolutions: dict[int, tuple[int, int]] = {}
+        self._lock = Lock()
+
+    def update(self, image: Image) -> int:
+        """记录新的一帧
+        Args:
+            image (Image): 截图
+        Returns:
+            int: 该帧的令牌
+        """
+        with self._lock:
+            self._index += 1
+            self._image = image
+            return self._index
+
+    def _current(self) -> tuple[int, np.ndarray | None]:
+        """计算并缓存最新一帧的缩略图"""
+        if self._image is None:
+            return 0, None
+
+        if self._index not in self._thumbnails:
+            self._thumbnails[self._index] = thumbnail(self._image)
+            self._resolutions[self._index] = self._image.resolution
+            while len(self._thumbnails) > self.history:
+                index, _ = self._thumbnails.popitem(last=False)
+                self._resolutions.pop(index, None)
+        return self._index, self._thumbnails[self._index]
+
+    def token(self) -> int:
+        """获取最新一帧的令牌，之后可用于判断画面是否变化，还没有截图时为 0"""
+        with self._lock:
+            return self._current()[0]
+
+    def changed_regions(self, token: int, threshold: int = None) -> list[Region]:
+        """自令牌对应的帧之后画面变化的区域
+        Args:
+            token (int): 之前获取的令牌
+            threshold (int, optional): 灰度差阈值，默认使用初始化时的设置
+        Returns:
+            list[tuple[int, int, int, int]]: 变化区域 (x1, y1, x2, y2) 列表，令牌已过期时为整个画面
+        """
+        with self._lock:
+            index, current = self._current()
+            if current is None or index == token:
+                return []
+
+            resolution = self._resolutions[index]
+            before = self._thumbnails.get(token)
+            if before is None or before.shape != current.shape or self._resolutions[token] != resolution:
+                return [(0, 0, *resolution)]
+
+            return _dirty_regions(before, current, resolution, self.threshold if threshold is None else threshold)
+
+    def changed(self, token: int, threshold: int = None) -> bool:
+        """画面自令牌对应的帧之后是否变化"""
+        return bool(self.changed_regions(token, threshold))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._index = 0
+            self._image = None
+            self._thumbnails.clear()
+            self._resolutions.clear()
@@ -1,5 +1,9 @@
 from paddleocr import PaddleOCR
-from fuzzywuzzy import fuzz
+from rapidfuzz import fuzz, process
+
+import numpy as np
+from threading import Lock
+from typing import Any
 
 import re
 import logging
@@ -7,25 +11,221 @@ import logging
 logging.disable(logging.CRITICAL)
 
 from model import Point, Image
+from config import get_config
+from log import logger
+
+from .ocr_cache import OcrCache
+from .ocr_result import OcrResult
 
 PaddleOCRResult = list[list[tuple[list[tuple[int, int]], tuple[str, float]]]]
 
-def image_ocr(image: Image, lang: str = "ch") -> PaddleOCRResult:
+class OcrEngine:
+    """已加载模型的 PaddleOCR 引擎，推理时加锁，可在多个脚本线程间共享"""
+    def __init__(self, lang: str, **options):
+        self.lang = lang
+        self.options = options
+        self.engine = PaddleOCR(lang=lang, **options)
+        self.lock = Lock()
+
+    def ocr(self, image_input: Any, **kwargs) -> PaddleOCRResult:
+        """调用 PaddleOCR.ocr，同一引擎同一时间只允许一个线程推理"""
+        with self.lock:
+            return self.engine.ocr(image_input, **kwargs)
+
+class OcrEnginePool:
+    """按 (语言, 参数) 缓存 OCR 引擎，模型只加载一次"""
+    def __init__(self):
+        self._engines: dict[tuple, OcrEngine] = {}
+        self._lock = Lock()
+
+    @staticmethod
+    def _key(lang: str, options: dict) -> tuple:
+        return lang, tuple(sorted(options.items()))
+
+    def get(self, lang: str = "ch", **options) -> OcrEngine:
+        """获取引擎，不存在时加载
+        Args:
+            lang (str): 识别语言
+            **options: 传给 PaddleOCR 的其他参数
+        Returns:
+            OcrEngine: OCR 引擎
+        """
+        options.setdefault("use_angle_cls", True)
+        key = self._key(lang, options)
+        
+        engine = self._engines.get(key)
+        if engine is not None:
+            return engine
+        
+        with self._lock:
+            engine = self._engines.get(key)
+            if engine is None:
+                logger.debug(f"加载 OCR 模型 {lang} {options}")
+                engine = OcrEngine(lang, **options)
+                self._engines[key] = engine
+        return engine
+
+    def warmup(self, langs: list[str]) -> None:
+        """预先加载指定语言的模型
+        Args:
+            langs (list[str]): 语言列表
+        """
+        for lang in langs:
+            try:
+                self.get(lang)
+            except Exception as e:
+                logger.warning(f"OCR 模型 {lang} 预加载失败 {e}")
+
+    def clear(self) -> None:
+        """释放所有已加载的引擎"""
+        with self._lock:
+            self._engines.clear()
+
+    def __len__(self) -> int:
+        return len(self._engines)
+
+ocr_engine_pool = OcrEnginePool()
+"""
+全局 OCR 引擎池
+"""
+
+def warmup_ocr_engines(langs: list[str] = None) -> None:
+    """预加载 OCR 模型，未指定语言时读取配置文件中的 ocr_warmup
+    Args:
+        langs (list[str], optional): 语言列表
+    """
+    if langs is None:
+        config = get_config()
+        langs = config.extra.get("ocr_warmup", []) if config else []
+    
+    if isinstance(langs, str):
+        langs = [langs]
+    
+    ocr_engine_pool.warmup(langs)
+
+ocr_result_cache = OcrCache()
+"""
+全局 OCR 结果缓存
+"""
+
+def configure_ocr_cache() -> None:
+    """根据配置文件中的 ocr_cache 设置缓存 (max_size, perceptual, max_distance)"""
+    config = get_config()
+    settings = config.extra.get("ocr_cache", {}) if config else {}
+    
+    if settings:
+        ocr_result_cache.configure(
+            max_size=settings.get("max_size"),
+            perceptual=settings.get("perceptual"),
+            max_distance=settings.get("max_distance"),
+        )
+
+def _screen_ocr_result(result: PaddleOCRResult, offset: tuple[int, int]) -> PaddleOCRResult:
+    """将裁切得到的图片中的识别结果换算为原始截图中的坐标"""
+    offset_x, offset_y = offset
+    if not offset_x and not offset_y:
+        return result
+    return [[[[[x + offset_x, y + offset_y] for x, y in bbox], text] for bbox, text in page or []] for page in result]
+
+def image_ocr(image: Image, lang: str = "ch", cache: bool = True, cls: bool = True) -> PaddleOCRResult:
     """
     使用 PaddleOCR 对图像进行 OCR 识别。
 
     Args:
         image (Image): 输入的图片。
         lang (str, optional): 识别语言，默认为 "ch"（中文）。
+        cache (bool, optional): 画面未变化时直接返回上次的识别结果，默认为 True。
+        cls (bool, optional): 是否使用方向分类器，画面文字均为正向时可关闭，默认为 True。
 
     Returns:
-        PaddleOCRResult: OCR 识别结果，包含识别出的文本及其位置信息。
+        PaddleOCRResult: OCR 识别结果，包含识别出的文本及其在原始截图中的位置信息。
     """
     
-    image_bytes = image.image_bytes
+    namespace = ("ocr", lang, cls, image.offset)
+    if cache:
+        image_key, result = ocr_result_cache.get(image, namespace)
+        if result is not None:
+            return result
+    
+    result = _screen_ocr_result(ocr_engine_pool.get(lang).ocr(image.array, cls=cls), image.offset)
     
-    paddleOCR = PaddleOCR(use_angle_cls=True, lang=lang)
-    return paddleOCR.ocr(image_bytes, cls=True)
+    if cache:
+        ocr_result_cache.put(image_key, result, namespace)
+    return result
+
+Region = tuple[int, int, int, int]
+
+def _normalize_regions(regions: Region | list[Region]) -> list[Region]:
+    """统一为区域列表，支持传入单个 (x1, y1, x2, y2)"""
+    regions = list(regions)
+    if regions and isinstance(regions[0], (int, float)):
+        regions = [regions]
+    return [tuple(int(value) for value in region) for region in regions]
+
+def image_ocr_regions(image: Image, regions: Region | list[Region], lang: str = "ch") -> PaddleOCRResult:
+    """
+    只对指定区域进行 OCR 识别，结果坐标已换算回原始截图。
+
+    Args:
+        image (Image): 输入的图片。
+        regions (Region | list[Region]): 一个或多个区域 (x1, y1, x2, y2)，为原始截图中的坐标。
+        lang (str, optional): 识别语言，默认为 "ch"（中文）。
+
+    Returns:
+        PaddleOCRResult: OCR 识别结果，所有区域的文字合并在同一页中，可直接用于各匹配函数。
+    """
+    
+    array = image.array
+    height, width = array.shape[:2]
+    offset_x, offset_y = image.offset
+    engine = ocr_engine_pool.get(lang)
+    
+    words = []
+    for x1, y1, x2, y2 in _normalize_regions(regions):
+        x1, y1, x2, y2 = x1 - offset_x, y1 - offset_y, x2 - offset_x, y2 - offset_y
+        x1, x2 = max(0, min(x1, x2)), min(width, max(x1, x2))
+        y1, y2 = max(0, min(y1, y2)), min(height, max(y1, y2))
+        if x2 - x1 < 2 or y2 - y1 < 2:
+            continue
+        
+        result = engine.ocr(np.ascontiguousarray(array[y1:y2, x1:x2]), cls=True)
+        for item in result:
+            for bbox, text in item or []:
+                words.append([[[x + x1 + offset_x, y + y1 + offset_y] for x, y in bbox], text])
+    
+    return [words]
+
+def image_ocr_detect(image: Image, lang: str = "ch") -> list[list[tuple[int, int]]]:
+    """
+    只进行文字检测，不识别文字内容。
+
+    Args:
+        image (Image): 输入的图片。
+        lang (str, optional): 模型语言，默认为 "ch"（中文）。
+
+    Returns:
+        list[list[tuple[int, int]]]: 文字区域的四个顶点在原始截图中的坐标列表。
+    """
+    
+    result = ocr_engine_pool.get(lang).ocr(image.array, rec=False)
+    offset_x, offset_y = image.offset
+    return [[[x + offset_x, y + offset_y] for x, y in box] for box in result[0] or []]
+
+def image_ocr_recognize(image: Image, lang: str = "ch", cls: bool = False) -> tuple[str, float]:
+    """
+    跳过文字检测，将整张图片视为一行文字直接识别，适用于已裁切好的文字区域。
+
+    Args:
+        image (Image): 输入的图片。
+        lang (str, optional): 识别语言，默认为 "ch"（中文）。
+        cls (bool, optional): 是否使用方向分类器，默认为 False。
+
+    Returns:
+        tuple[str, float]: 识别出的文字与置信度。
+    """
+    
+    result = ocr_engine_pool.get(lang).ocr(image.array, det=False, cls=cls)
+    return tuple(result[0][0])
 
 def exact_match(ocr_result: PaddleOCRResult, target: str) -> Point:
     """
@@ -39,6 +239,9 @@ def exact_match(ocr_result: PaddleOCRResult, target: str) -> Point:
         Point: 匹配文字的中心点坐标 (x, y)。
     """
     
+    if isinstance(ocr_result, OcrResult):
+        return ocr_result.find(target)
+    
     for item in ocr_result:
         for word in item:
             text = word[1][0]
@@ -61,6 +264,10 @@ def simple_fuzzy_match(ocr_result: PaddleOCRResult, target: str) -> Point:
         Point: 匹配文字的中心点坐标 (x, y)。
     """
     
+    if isinstance(ocr_result, OcrResult):
+        points = ocr_result.contains(target)
+        return points[0] if points else None
+    
     for item in ocr_result:
         for word in item:
             text = word[1][0]
@@ -71,6 +278,79 @@ def simple_fuzzy_match(ocr_result: PaddleOCRResult, target: str) -> Point:
                 return Point(x= center_x, y= center_y)
     return None
 
+def _ocr_words(ocr_result: PaddleOCRResult) -> tuple[list[str], list[Point]]:
+    """取出所有文字 (小写) 与对应的中心点"""
+    if isinstance(ocr_result, OcrResult):
+        return [word.text.lower() for word in ocr_result.words], [word.center for word in ocr_result.words]
+    
+    texts = []
+    centers = []
+    for item in ocr_result:
+        for bbox, (text, _) in item or []:
+            texts.append(text.lower())
+            centers.append(Point(x= (bbox[0][0] + bbox[2][0]) // 2, y= (bbox[0][1] + bbox[2][1]) // 2))
+    return texts, centers
+
+def fuzzy_scores(ocr_result: PaddleOCRResult, target: str, limit: int = 5, score_cutoff: float = 0) -> list[tuple[Point, float]]:
+    """
+    批量计算目标字符串与所有文字的相似度，返回得分最高的若干结果。
+
+    Args:
+        ocr_result (PaddleOCRResult): OCR 识别结果，包含识别出的文本及其位置信息。
+        target (str): 要匹配的目标字符串。
+        limit (int, optional): 最多返回的结果数量，为 None 时返回全部，默认为 5。
+        score_cutoff (float, optional): 最低得分 (0-100)，默认为 0。
+
+    Returns:
+        list[tuple[Point, float]]: 按得分降序排列的 (中心点坐标, 得分)。
+    """
+    
+    texts, centers = _ocr_words(ocr_result)
+    matches = process.extract(target.lower(), texts, scorer=fuzz.ratio, limit=limit, score_cutoff=score_cutoff)
+    return [(centers[index], score) for _, score, index in matches if score > 0]
+
+def fuzzy_match_top(ocr_result: PaddleOCRResult, target: str, limit: int = 5, score_cutoff: float = 0) -> list[Point]:
+    """
+    在模糊匹配中查找目标字符串，按相似度返回多个中心点坐标。
+
+    Args:
+        ocr_result (PaddleOCRResult): OCR 识别结果，包含识别出的文本及其位置信息。
+        target (str): 要匹配的目标字符串。
+        limit (int, optional): 最多返回的结果数量，默认为 5。
+        score_cutoff (float, optional): 最低得分 (0-100)，默认为 0。
+
+    Returns:
+        list[Point]: 按相似度降序排列的中心点坐标。
+    """
+    
+    return [point for point, _ in fuzzy_scores(ocr_result, target, limit, score_cutoff)]
+
+def fuzzy_match_many(ocr_result: PaddleOCRResult, targets: list[str], score_cutoff: float = 0) -> dict[str, Point | None]:
+    """
+    一次模糊匹配多个目标字符串，所有得分在一次矩阵计算中完成。
+
+    Args:
+        ocr_result (PaddleOCRResult): OCR 识别结果，包含识别出的文本及其位置信息。
+        targets (list[str]): 要匹配的目标字符串列表。
+        score_cutoff (float, optional): 最低得分 (0-100)，默认为 0。
+
+    Returns:
+        dict[str, Point | None]: 每个目标字符串最相似文字的中心点坐标，未找到时为 None。
+    """
+    
+    texts, centers = _ocr_words(ocr_result)
+    if not texts or not targets:
+        return {target: None for target in targets}
+    
+    scores = process.cdist([target.lower() for target in targets], texts, scorer=fuzz.ratio, dtype=np.float32)
+    best = scores.argmax(axis=1)
+    
+    results = {}
+    for row, target in enumerate(targets):
+        score = scores[row, best[row]]
+        results[target] = centers[best[row]] if score > 0 and score >= score_cutoff else None
+    return results
+
 def fuzzy_match(ocr_result: PaddleOCRResult, target: str) -> Point:
     """
     在模糊匹配中查找目标字符串，并返回其中心点坐标。
@@ -83,25 +363,8 @@ def fuzzy_match(ocr_result: PaddleOCRResult, target: str) -> Point:
         Point: 匹配文字的中心点坐标 (x, y)。
     """
     
-    best_match = None
-    best_score = 0
-    
-    for item in ocr_result:
-        for word in item:
-            text = word[1][0]
-            score = fuzz.ratio(target.lower(), text.lower())
-            
-            if score > best_score:
-                best_score = score
-                best_match = word
-    
-    if best_match:
-        bbox = best_match[0]
-        center_x = (bbox[0][0] + bbox[2][0]) // 2
-        center_y = (bbox[0][1] + bbox[2][1]) // 2
-        return Point(x= center_x, y= center_y)
-    
-    return None
+    matches = fuzzy_scores(ocr_result, target, limit=1)
+    return matches[0][0] if matches else None
 
 def regex_match(ocr_result: PaddleOCRResult, pattern: str) -> Point:
     """
@@ -0,0 +1,212 @@
+from concurrent.futures import Future
+from queue import Queue, Empty
+from threading import Thread, Lock, Event
+from time import monotonic
+
+import cv2
+import numpy as np
+
+from model import Image
+from log import logger
+
+from .image_ocr import PaddleOCRResult, ocr_engine_pool, ocr_result_cache, _screen_ocr_result
+
+def _crop_box(array: np.ndarray, box: list[list[float]]) -> np.ndarray:
+    """按检测框透视裁切文字区域，竖排文字旋转为横排"""
+    points = np.array(box, dtype=np.float32)
+    width = int(max(np.linalg.norm(points[0] - points[1]), np.linalg.norm(points[2] - points[3])))
+    height = int(max(np.linalg.norm(points[0] - points[3]), np.linalg.norm(points[1] - points[2])))
+    width, height = max(width, 1), max(height, 1)
+
+    target = np.array([[0, 0], [width, 0], [width, height], [0, height]], dtype=np.float32)
+    matrix = cv2.getPerspectiveTransform(points, target)
+    crop = cv2.warpPerspective(array, matrix, (width, height), borderMode=cv2.BORDER_REPLICATE, flags=cv2.INTER_CUBIC)
+
+    if height / width >= 1.5:
+        crop = np.rot90(crop)
+    return np.ascontiguousarray(crop)
+
+def batch_image_ocr(images: list[Image], lang: str = "ch", return_exceptions: bool = False) -> list[PaddleOCRResult | Exception]:
+    """
+    对多张图片进行 OCR 识别，所有文字区域在一次识别推理中批量完成。
+
+    Args:
+        images (list[Image]): 输入的图片列表。
+        lang (str, optional): 识别语言，默认为 "ch"（中文）。
+        return_exceptions (bool, optional): 单张图片检测失败时在其位置返回异常而不是抛出，其余图片照常识别。默认为 False。
+
+    Returns:
+        list[PaddleOCRResult | Exception]: 与输入顺序一致的识别结果，坐标为原始截图中的坐标。
+    """
+
+    engine = ocr_engine_pool.get(lang)
+    drop_score = getattr(engine.engine, "drop_score", 0.5)
+
+    boxes_list = []
+    errors: dict[int, Exception] = {}
+    crops = []
+    for position, image in enumerate(images):
+        try:
+            array = image.array
+            boxes = engine.ocr(array, rec=False)[0] or []
+            boxes = sorted(boxes, key=lambda box: (box[0][1], box[0][0]))
+            image_crops = [_crop_box(array, box) for box in boxes]
+        except Exception as e:
+            if not return_exceptions:
+                raise
+            errors[position] = e
+            boxes, image_crops = [], []
+        boxes_list.append(boxes)
+        crops.extend(image_crops)
+
+    texts = engine.ocr(crops, det=False, cls=True)[0] if crops else []
+
+    results = []
+    index = 0
+    for position, boxes in enumerate(boxes_list):
+        if position in errors:
+            results.append(errors[position])
+            continue
+        words = []
+        for box in boxes:
+            text = tuple(texts[index])
+            index += 1
+            if text[1] >= drop_score:
+                words.append([box, text])
+        results.append(_screen_ocr_result([words], images[position].offset))
+
+    return results
+
+class _OcrRequest:
+    def __init__(self, image: Image, lang: str):
+        self.image = image
+        self.lang = lang
+        self.future: Future = Future()
+
+class OcrBatchService:
+    """收集多个脚本线程的 OCR 请求，在一个短时间窗口内合并为一次批量识别"""
+    def __init__(self, window: float = 0.05, max_batch: int = 8):
+        """
+        Args:
+            window (float, optional): 收到第一个请求后等待其他请求的时间 (秒)
+            max_batch (int, optional): 单次合并的最大图片数量
+        """
+        self.window = window
+        self.max_batch = max_batch
+        self._queue: Queue[_OcrRequest | None] = Queue()
+        self._thread: Thread | None = None
+        self._stop = Event()
+        self._lock = Lock()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = Thread(target=self._worker, daemon=True)
+                self._thread.start()
+
+    def shutdown(self, timeout: float = None) -> None:
+        """停止后台线程，之后提交请求时会重新启动
+        Args:
+            timeout (float, optional): 等待线程退出的最长时间 (秒)
+        """
+        with self._lock:
+            thread, self._thread = self._thread, None
+            if thread is None:
+                return
+            self._stop.set()
+            self._queue.put(None)
+        thread.join(timeout)
+
+    def _collect(self) -> list[_OcrRequest]:
+        """收集一批请求，收到停止信号 (None) 时返回已收集的请求"""
+        requests = []
+        deadline = None
+
+        while len(requests) < self.max_batch:
+            timeout = None if deadline is None else deadline - monotonic()
+            if timeout is not None and timeout <= 0:
+                break
+            try:
+                request = self._queue.get(timeout=timeout)
+            except Empty:
+                break
+            if request is None:
+                break
+            requests.append(request)
+            if deadline is None:
+                deadline = monotonic() + self.window
+
+        return requests
+
+    def _worker(self) -> None:
+        while not self._stop.is_set():
+            requests = self._collect()
+
+            groups: dict[str, list[_OcrRequest]] = {}
+            for request in requests:
+                groups.setdefault(request.lang, []).append(request)
+
+            for lang, group in groups.items():
+                try:
+                    results = batch_image_ocr([request.image for request in group], lang, return_exceptions=True)
+                except Exception as e:
+                    logger.error(f"批量 OCR 识别失败 {e}")
+                    for request in group:
+                        request.future.set_exception(e)
+                    continue
+
+                # 单张图片检测失败只影响该图片的请求
+                for request, result in zip(group, results):
+                    if isinstance(result, Exception):
+                        logger.error(f"OCR 识别失败 {result}")
+                        request.future.set_exception(result)
+                    else:
+                        request.future.set_result(result)
+
+    def submit(self, image: Image, lang: str = "ch") -> Future:
+        """提交识别请求
+        Args:
+            image (Image): 输入的图片
+            lang (str, optional): 识别语言
+        Returns:
+            Future: 识别完成后得到 PaddleOCRResult
+        """
+        self._start()
+        request = _OcrRequest(image, lang)
+        self._queue.put(request)
+        return request.future
+
+    def ocr(self, image: Image, lang: str = "ch") -> PaddleOCRResult:
+        """提交识别请求并等待结果"""
+        return self.submit(image, lang).result()
+
+ocr_batch_service = OcrBatchService()
+"""
+全局批量 OCR 服务
+"""
+
+def batched_image_ocr(image: Image, lang: str = "ch", cache: bool = True) -> PaddleOCRResult:
+    """
+    通过批量 OCR 服务识别图片，多设备同时识别时会合并为一次推理。
+
+    Args:
+        image (Image): 输入的图片。
+        lang (str, optional): 识别语言，默认为 "ch"（中文）。
+        cache (bool, optional): 画面未变化时直接返回上次的识别结果，默认为 True。
+
+    Returns:
+        PaddleOCRResult: OCR 识别结果，包含识别出的文本及其在原始截图中的位置信息。
+    """
+
+    namespace = ("ocr", lang, True, image.offset)
+    if cache:
+        image_key, result = ocr_result_cache.get(image, namespace)
+        if result is not None:
+            return result
+
+    result = ocr_batch_service.ocr(image, lang)
+
+    if cache:
+        ocr_result_cache.put(image_key, result, namespace)
+    return result
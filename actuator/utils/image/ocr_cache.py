@@ -0,0 +1,136 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable
+
+import hashlib
+import cv2
+import numpy as np
+
+from model import Image
+
+def content_hash(image: Image) -> str:
+    """图片内容哈希，内容完全一致时相同
+    Args:
+        image (Image): 输入的图片
+    Returns:
+        str: 十六进制哈希值
+    """
+    if image.encoded:
+        return hashlib.blake2b(image.image_bytes, digest_size=16).hexdigest()
+
+    # 像素数组相同但尺寸不同的图片不能共用结果
+    array = np.ascontiguousarray(image.array)
+    digest = hashlib.blake2b(f"{array.shape} {array.dtype}".encode(), digest_size=16)
+    digest.update(array)
+    return digest.hexdigest()
+
+def perceptual_hash(image: Image) -> int:
+    """图片感知哈希 (dHash)，画面近似时汉明距离很小
+    Args:
+        image (Image): 输入的图片
+    Returns:
+        int: 64 位哈希值
+    """
+    small = cv2.resize(image.gray, (9, 8), interpolation=cv2.INTER_AREA)
+    bits = (small[:, 1:] > small[:, :-1]).flatten()
+    return int.from_bytes(np.packbits(bits).tobytes(), "big")
+
+class OcrCache:
+    """OCR 结果缓存，按图片内容哈希或感知哈希查找，LRU 淘汰"""
+    def __init__(self, max_size: int = 32, perceptual: bool = False, max_distance: int = 2):
+        """
+        Args:
+            max_size (int, optional): 最多缓存的结果数量
+            perceptual (bool, optional): 是否使用感知哈希匹配近似画面
+            max_distance (int, optional): 感知哈希允许的最大汉明距离
+        """
+        self.max_size = max_size
+        self.perceptual = perceptual
+        self.max_distance = max_distance
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple, Any] = OrderedDict()
+        self._lock = Lock()
+
+    def _image_key(self, image: Image) -> str | int:
+        return perceptual_hash(image) if self.perceptual else content_hash(image)
+
+    def _find(self, namespace: Hashable, image_key: str | int) -> tuple | None:
+        key = (namespace, image_key)
+        if key in self._entries:
+            return key
+
+        if not self.perceptual:
+            return None
+
+        for cached_namespace, cached_key in reversed(self._entries):
+            if cached_namespace != namespace or not isinstance(cached_key, int):
+                continue
+            if (cached_key ^ image_key).bit_count() <= self.max_distance:
+                return cached_namespace, cached_key
+        return None
+
+    def get(self, image: Image, namespace: Hashable = None) -> tuple[str | int, Any]:
+        """查找缓存
+        Args:
+            image (Image): 输入的图片
+            namespace (Hashable, optional): 区分不同识别参数的命名空间
+        Returns:
+            tuple[str | int, Any]: 图片哈希 (用于 put) 与缓存的结果，未命中时结果为 None
+        """
+        image_key = self._image_key(image)
+
+        with self._lock:
+            key = self._find(namespace, image_key)
+            if key is None:
+                self.misses += 1
+                return image_key, None
+
+            self.hits += 1
+            self._entries.move_to_end(key)
+            return image_key, self._entries[key]
+
+    def put(self, image_key: str | int, result: Any, namespace: Hashable = None) -> None:
+        """写入缓存
+        Args:
+            image_key (str | int): get 返回的图片哈希
+            result (Any): 识别结果
+            namespace (Hashable, optional): 区分不同识别参数的命名空间
+        """
+        if self.max_size <= 0:
+            return
+
+        with self._lock:
+            self._entries[(namespace, image_key)] = result
+            self._entries.move_to_end((namespace, image_key))
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def configure(self, max_size: int = None, perceptual: bool = None, max_distance: int = None) -> None:
+        """修改缓存设置，已有缓存会被清空"""
+        if max_size is not None:
+            self.max_size = max_size
+        if perceptual is not None:
+            self.perceptual = perceptual
+        if max_distance is not None:
+            self.max_distance = max_distance
+        self.clear()
+
+    def clear(self) -> None:
+        """清空缓存与计数"""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, int]:
+        """缓存统计信息"""
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __len__(self) -> int:
+        return len(self._entries)
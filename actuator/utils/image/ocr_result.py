@@ -0,0 +1,211 @@
+from math import hypot
+from typing import Iterator
+
+from model import Point
+
+class OcrWord:
+    """一条 OCR 识别出的文字"""
+    def __init__(self, box: list[list[float]], text: str, score: float):
+        self.box = box
+        self.text = text
+        self.score = score
+
+        xs = [point[0] for point in box]
+        ys = [point[1] for point in box]
+        self.rect: tuple[int, int, int, int] = (int(min(xs)), int(min(ys)), int(max(xs)), int(max(ys)))
+        self.center = Point(x= (box[0][0] + box[2][0]) // 2, y= (box[0][1] + box[2][1]) // 2)
+
+    def __str__(self):
+        return f"文字 {self.text} {self.center}"
+
+class OcrResult:
+    """对一次 OCR 结果建立索引，可多次查询而无需重新遍历"""
+    def __init__(self, ocr_result: list, cell_size: int = 64):
+        """
+        Args:
+            ocr_result (PaddleOCRResult): OCR 识别结果
+            cell_size (int, optional): 空间索引网格大小 (像素)
+        """
+        self.raw = ocr_result
+        self.cell_size = cell_size
+        self.words: list[OcrWord] = []
+        self._text_index: dict[str, list[OcrWord]] = {}
+        self._lower_index: dict[str, list[OcrWord]] = {}
+        self._grid: dict[tuple[int, int], list[OcrWord]] = {}
+
+        for item in ocr_result:
+            for box, (text, score) in item or []:
+                word = OcrWord(box, text, score)
+                self.words.append(word)
+                self._text_index.setdefault(text, []).append(word)
+                self._lower_index.setdefault(text.lower(), []).append(word)
+                self._grid.setdefault(self._cell(word.center.x, word.center.y), []).append(word)
+
+    def _cell(self, x: float, y: float) -> tuple[int, int]:
+        return int(x // self.cell_size), int(y // self.cell_size)
+
+    def find(self, text: str) -> Point | None:
+        """全词匹配，返回第一个结果的中心点"""
+        words = self._text_index.get(text)
+        return words[0].center if words else None
+
+    def find_all(self, text: str, ignore_case: bool = False) -> list[Point]:
+        """全词匹配，返回所有结果的中心点"""
+        index = self._lower_index if ignore_case else self._text_index
+        return [word.center for word in index.get(text.lower() if ignore_case else text, [])]
+
+    def contains(self, text: str) -> list[Point]:
+        """忽略大小写的包含匹配，返回所有结果的中心点"""
+        text = text.lower()
+        return [
+            word.center
+            for lower, words in self._lower_index.items() if text in lower
+            for word in words
+        ]
+
+    def find_many(self, targets: list[str]) -> dict[str, Point | None]:
+        """一次查询多个目标文字"""
+        return {target: self.find(target) for target in targets}
+
+    def nearest(self, x: int, y: int, text: str = None) -> Point | None:
+        """查找离指定坐标最近的文字
+        Args:
+            x (int): x 坐标
+            y (int): y 坐标
+            text (str, optional): 只在该文字的全词匹配结果中查找
+        Returns:
+            Point | None: 最近文字的中心点
+        """
+        if text is not None:
+            words = self._text_index.get(text, [])
+            best = min(words, key=lambda word: hypot(word.center.x - x, word.center.y - y), default=None)
+            return best.center if best else None
+
+        if not self.words:
+            return None
+
+        cx, cy = self._cell(x, y)
+        best, best_distance = None, float("inf")
+        max_ring = max(max(abs(gx - cx), abs(gy - cy)) for gx, gy in self._grid)
+
+        for ring in range(max_ring + 1):
+            # 当前环之外的格子距离不小于 (ring - 1) * cell_size
+            if best is not None and (ring - 1) * self.cell_size > best_distance:
+                break
+            for gx in range(cx - ring, cx + ring + 1):
+                for gy in (cy - ring, cy + ring) if abs(gx - cx) != ring else range(cy - ring, cy + ring + 1):
+                    for word in self._grid.get((gx, gy), []):
+                        distance = hypot(word.center.x - x, word.center.y - y)
+                        if distance < best_distance:
+                            best, best_distance = word, distance
+
+        return best.center if best else None
+
+    def in_rect(self, x1: int, y1: int, x2: int, y2: int) -> list[OcrWord]:
+        """返回中心点在矩形内的所有文字"""
+        x1, x2 = min(x1, x2), max(x1, x2)
+        y1, y2 = min(y1, y2), max(y1, y2)
+        gx1, gy1 = self._cell(x1, y1)
+        gx2, gy2 = self._cell(x2, y2)
+
+        words = []
+        for gx in range(gx1, gx2 + 1):
+            for gy in range(gy1, gy2 + 1):
+                for word in self._grid.get((gx, gy), []):
+                    if x1 <= word.center.x <= x2 and y1 <= word.center.y <= y2:
+                        words.append(word)
+        return words
+
+    def texts_in_rect(self, x1: int, y1: int, x2: int, y2: int) -> list[str]:
+        """返回中心点在矩形内的所有文字内容"""
+        return [word.text for word in self.in_rect(x1, y1, x2, y2)]
+
+    @property
+    def texts(self) -> list[str]:
+        return [word.text for word in self.words]
+
+    def __iter__(self) -> Iterator[list]:
+        """按 PaddleOCRResult 的格式迭代，兼容原有匹配函数"""
+        return (item for item in self.raw if item)
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def __str__(self):
+        return f"OCR 结果 共 {len(self.words)} 条文字"
+
+def ocr_index(ocr_result: list) -> OcrResult:
+    """
+    为 OCR 结果建立索引，之后可多次快速查询。
+
+    Args:
+        ocr_result (PaddleOCRResult): OCR 识别结果。
+
+    Returns:
+        OcrResult: 建立了文字索引与空间索引的识别结果，也可直接传给各匹配函数。
+    """
+    
+    if isinstance(ocr_result, OcrResult):
+        return ocr_result
+    return OcrResult(ocr_result)
+
+def find_all_text(ocr_result: list, target: str) -> list[Point]:
+    """
+    全词匹配目标字符串，返回所有结果的中心点坐标。
+
+    Args:
+        ocr_result (PaddleOCRResult | OcrResult): OCR 识别结果。
+        target (str): 要匹配的目标字符串。
+
+    Returns:
+        list[Point]: 所有匹配文字的中心点坐标。
+    """
+    
+    return ocr_index(ocr_result).find_all(target)
+
+def find_many_text(ocr_result: list, targets: list[str]) -> dict[str, Point | None]:
+    """
+    一次全词匹配多个目标字符串。
+
+    Args:
+        ocr_result (PaddleOCRResult | OcrResult): OCR 识别结果。
+        targets (list[str]): 要匹配的目标字符串列表。
+
+    Returns:
+        dict[str, Point | None]: 每个目标字符串对应的中心点坐标，未找到时为 None。
+    """
+    
+    return ocr_index(ocr_result).find_many(targets)
+
+def nearest_text(ocr_result: list, x: int, y: int, target: str = None) -> Point | None:
+    """
+    查找离指定坐标最近的文字，并返回其中心点坐标。
+
+    Args:
+        ocr_result (PaddleOCRResult | OcrResult): OCR 识别结果。
+        x (int): x 坐标。
+        y (int): y 坐标。
+        target (str, optional): 只在该字符串的全词匹配结果中查找。
+
+    Returns:
+        Point: 最近文字的中心点坐标 (x, y)。
+    """
+    
+    return ocr_index(ocr_result).nearest(x, y, target)
+
+def texts_in_rect(ocr_result: list, x1: int, y1: int, x2: int, y2: int) -> list[str]:
+    """
+    获取矩形区域内的所有文字。
+
+    Args:
+        ocr_result (PaddleOCRResult | OcrResult): OCR 识别结果。
+        x1 (int): 左上角 x 坐标。
+        y1 (int): 左上角 y 坐标。
+        x2 (int): 右下角 x 坐标。
+        y2 (int): 右下角 y 坐标。
+
+    Returns:
+        list[str]: 中心点在区域内的文字。
+    """
+    
+    return ocr_index(ocr_result).texts_in_rect(x1, y1, x2, y2)
@@ -1,119 +1,563 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Lock
+
+import os
 import cv2
 import numpy as np
-import io
-from PIL import Image as PILImage
 
 from model import Point, Image
+from config import get_config
+
+from .template_registry import Template, template_registry
+
+TemplateLike = Template | Image | str
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = Lock()
+
+def _get_executor() -> ThreadPoolExecutor:
+    """模板匹配共用的线程池，大小由配置文件中的 template_workers 决定"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            config = get_config()
+            workers = config.extra.get("template_workers", os.cpu_count()) if config else os.cpu_count()
+            _executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="template")
+        return _executor
+
+def _match(img: np.ndarray, tmpl: np.ndarray, mask: np.ndarray = None) -> np.ndarray:
+    """模板匹配，彩色图片按通道分别匹配并取最小值，带遮罩时无法计算的位置视为 0"""
+    if img.ndim == 3:
+        return np.minimum.reduce([_match(channel, tmpl_channel, mask) for channel, tmpl_channel in zip(cv2.split(img), cv2.split(tmpl))])
+    if mask is None:
+        return cv2.matchTemplate(img, tmpl, cv2.TM_CCOEFF_NORMED)
+    return np.nan_to_num(cv2.matchTemplate(img, tmpl, cv2.TM_CCOEFF_NORMED, mask=mask), nan=0.0, posinf=0.0, neginf=0.0)
+
+def _parallel_match(img: np.ndarray, tmpl: np.ndarray, tiles: int, mask: np.ndarray = None) -> np.ndarray:
+    """将图片按行切分为相互重叠的条带并行匹配，拼接后与整图匹配结果一致"""
+    h_img = img.shape[0]
+    h_tmpl = tmpl.shape[0]
+    rows = h_img - h_tmpl + 1
+    bounds = np.linspace(0, rows, min(tiles, rows) + 1, dtype=int)
+
+    def match(y1: int, y2: int) -> np.ndarray:
+        return _match(img[y1: y2 + h_tmpl - 1], tmpl, mask)
+
+    futures = [_get_executor().submit(match, y1, y2) for y1, y2 in zip(bounds[:-1], bounds[1:]) if y2 > y1]
+    return np.vstack([future.result() for future in futures])
+
+_COLOR_TOLERANCE = 32
+"""
+彩色匹配时，目标区域与模板各通道平均颜色允许的最大差值
+"""
+
+Matches = np.ndarray
+"""
+匹配结果数组，每行为 (信心度, 中心 x, 中心 y, 模板宽, 模板高)
+"""
+
+_NO_MATCHES: Matches = np.empty((0, 5), np.float64)
+
+def _peaks(result: np.ndarray, min_confidence: float, w_tmpl: int, h_tmpl: int, offset_x: int = 0, offset_y: int = 0) -> Matches:
+    """取出匹配结果中高于最小信心度的局部极大值"""
+    mask = result >= min_confidence
+    if not mask.any():
+        return _NO_MATCHES
+    
+    mask &= result >= cv2.dilate(result, np.ones((3, 3), np.uint8))
+    ys, xs = np.nonzero(mask)
+    count = len(xs)
+    return np.column_stack([
+        result[ys, xs],
+        xs + offset_x + w_tmpl // 2,
+        ys + offset_y + h_tmpl // 2,
+        np.full(count, w_tmpl),
+        np.full(count, h_tmpl),
+    ])
+
+def _nms(matches: Matches, max_results: int = None) -> Matches:
+    """非极大值抑制，中心距离小于模板一半尺寸的结果视为同一目标，按信心度降序返回"""
+    if len(matches) == 0:
+        return matches
+    
+    matches = matches[np.argsort(-matches[:, 0], kind="stable")]
+    suppressed = np.zeros(len(matches), bool)
+    keep = []
+    
+    for index in range(len(matches)):
+        if suppressed[index]:
+            continue
+        keep.append(index)
+        if max_results and len(keep) >= max_results:
+            break
+        _, cx, cy, w, h = matches[index]
+        suppressed |= (np.abs(matches[:, 1] - cx) < (matches[:, 3] + w) / 4) & (np.abs(matches[:, 2] - cy) < (matches[:, 4] + h) / 4)
+    
+    return matches[keep]
+
+def _screen_matches(image: Image, matches: Matches) -> Matches:
+    """将匹配结果的中心点换算为原始截图中的坐标，裁切得到的图片需要加上其偏移"""
+    offset_x, offset_y = image.offset
+    if offset_x or offset_y:
+        matches = matches + (0, offset_x, offset_y, 0, 0)
+    return matches
+
+def _to_points(matches: Matches) -> list[Point]:
+    """转换为按信心度降序排列的中心点列表"""
+    return [Point(x= int(center_x), y= int(center_y)) for _, center_x, center_y, _, _ in matches]
+
+def _to_results(matches: Matches) -> tuple[dict[float, Point], list[float]]:
+    """转换为 (信心度 -> 坐标字典, 信心度降序列表)"""
+    result_dict = {}
+    confidence_list = []
+    for confidence, center_x, center_y, _, _ in matches:
+        confidence = np.float32(confidence)
+        result_dict[confidence] = Point(x= int(center_x), y= int(center_y))
+        confidence_list.append(confidence)
+    return result_dict, sorted(confidence_list, reverse=True)
 
-def _template_matching(image: Image, tmpl: Image, min_confidence: float = 0.93) -> tuple[dict[float, Point], list[float]]:
+def _search_region(
+    image_shape: tuple[int, int],
+    tmpl_shape: tuple[int, int],
+    region: tuple[int, int, int, int] = None,
+    near: Point | tuple[int, int] = None,
+    radius: int = 100,
+) -> tuple[int, int, int, int] | None:
+    """计算优先搜索的区域，区域过小放不下模板时返回 None"""
+    h_img, w_img = image_shape
+    h_tmpl, w_tmpl = tmpl_shape
+    
+    if region is not None:
+        x1, y1, x2, y2 = (int(value) for value in region)
+    elif near is not None:
+        x, y = near.to_tuple() if isinstance(near, Point) else near
+        x1, y1 = int(x) - radius - w_tmpl // 2, int(y) - radius - h_tmpl // 2
+        x2, y2 = int(x) + radius + w_tmpl - w_tmpl // 2, int(y) + radius + h_tmpl - h_tmpl // 2
+    else:
+        return None
+    
+    x1, x2 = max(0, min(x1, x2)), min(w_img, max(x1, x2))
+    y1, y2 = max(0, min(y1, y2)), min(h_img, max(y1, y2))
+    if x2 - x1 < w_tmpl or y2 - y1 < h_tmpl:
+        return None
+    return x1, y1, x2, y2
+
+def _match_template(
+    image: Image,
+    tmpl: TemplateLike,
+    min_confidence: float = 0.93,
+    max_results: int = None,
+    workers: int = 0,
+    region: tuple[int, int, int, int] = None,
+    near: Point | tuple[int, int] = None,
+    radius: int = 100,
+    color: bool = False,
+) -> Matches:
     """在输入图片中查找模板图像，并返回匹配结果。
 
+    带透明通道的 PNG 模板会自动以不透明部分作为遮罩，透明部分不参与匹配。
+    输入图片为裁切得到的图片时，region、near 与返回的坐标均为原始截图中的坐标。
+
     Args:
         image (Image): 输入的图片，在该图片中查找模板图像。
-        tmpl (Image): 模板的图片，在输入图片中查找此模板。
+        tmpl (TemplateLike): 模板的图片、已注册的模板名或模板文件路径，在输入图片中查找此模板。
         min_confidence (float, optional): 最小信心度，该方法返回大于此信心度的结果。默认为0.93。
+        max_results (int, optional): 最多返回的目标数量，相邻的重复结果会被合并。默认为None (不限制)。
+        workers (int, optional): 大于 1 时将图片切分为条带在线程池中并行匹配，适用于超大截图。默认为0。
+        region (tuple[int, int, int, int], optional): 优先搜索的区域 (x1, y1, x2, y2)，未找到时再搜索整张图片。默认为None。
+        near (Point | tuple[int, int], optional): 上一次匹配的位置，优先搜索其附近。默认为None。
+        radius (int, optional): near 附近的搜索半径。默认为100。
+        color (bool, optional): 按 BGR 各通道分别匹配并校验平均颜色，可区分形状相同但颜色不同的界面状态。默认为False。
 
     Returns:
-        Tuple[Dict[float, Point], List[float]]: 
-            - result_dic: 字典，键为信心度，值为匹配位置的坐标元组。
-            - confidence_list: 信心度降序排列的列表。
+        Matches: 按信心度降序排列的匹配结果，重复目标已合并。
     """
     
-    image_bytes = image.image_bytes
-    tmpl_bytes = tmpl.image_bytes
+    # 灰度处理，彩色匹配时保留 BGR
+    img = image.array if color else image.gray
+    template = template_registry.resolve(tmpl)
     
-    img = PILImage.open(io.BytesIO(image_bytes))
-    template = PILImage.open(io.BytesIO(tmpl_bytes))
-    img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-    template = cv2.cvtColor(np.array(template), cv2.COLOR_RGB2BGR)
+    # 搜索区域换算为图片内的坐标
+    offset_x, offset_y = image.offset
+    if region is not None:
+        x1, y1, x2, y2 = region
+        region = (x1 - offset_x, y1 - offset_y, x2 - offset_x, y2 - offset_y)
+    if near is not None:
+        x, y = near.to_tuple() if isinstance(near, Point) else near
+        near = (x - offset_x, y - offset_y)
     
-    # 灰度处理
-    gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray_tmpl = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
-    h_tmpl, w_tmpl = gray_tmpl.shape  # 获取模板尺寸
+    return _screen_matches(image, _match_array(img, template, min_confidence, max_results, workers, region, near, radius))
+
+def _check_colors(img: np.ndarray, template: Template, matches: Matches) -> Matches:
+    """过滤平均颜色与模板相差过大的匹配结果"""
+    if len(matches) == 0:
+        return matches
+    
+    expected = np.array(template.mean_color)
+    keep = []
+    for index, (_, center_x, center_y, w_tmpl, h_tmpl) in enumerate(matches):
+        x, y = int(center_x) - int(w_tmpl) // 2, int(center_y) - int(h_tmpl) // 2
+        window = img[y: y + int(h_tmpl), x: x + int(w_tmpl)]
+        actual = np.array(cv2.mean(window, template.mask)[:3])
+        if np.abs(actual - expected).max() <= _COLOR_TOLERANCE:
+            keep.append(index)
+    return matches[keep]
+
+def _match_array(
+    img: np.ndarray,
+    template: Template,
+    min_confidence: float = 0.93,
+    max_results: int = None,
+    workers: int = 0,
+    region: tuple[int, int, int, int] = None,
+    near: Point | tuple[int, int] = None,
+    radius: int = 100,
+) -> Matches:
+    """在已解码的图片中查找模板，灰度图片按灰度匹配，BGR 图片按彩色匹配，参数同 _match_template"""
+    color = img.ndim == 3
+    tmpl = template.color if color else template.gray
+    h_tmpl, w_tmpl = template.shape  # 获取模板尺寸
+
+    def peaks(res: np.ndarray, offset_x: int = 0, offset_y: int = 0) -> Matches:
+        matches = _peaks(res, min_confidence, w_tmpl, h_tmpl, offset_x, offset_y)
+        return _nms(_check_colors(img, template, matches) if color else matches, max_results)
+
+    # 优先搜索指定区域
+    if search := _search_region(img.shape[:2], template.shape, region, near, radius):
+        x1, y1, x2, y2 = search
+        matches = peaks(_match(img[y1:y2, x1:x2], tmpl, template.mask), x1, y1)
+        if len(matches):
+            return matches
 
     # 模板匹配
-    res = cv2.matchTemplate(gray_img, gray_tmpl, cv2.TM_CCOEFF_NORMED)
-    loc = np.where(res >= min_confidence)
+    if workers > 1:
+        res = _parallel_match(img, tmpl, workers, template.mask)
+    else:
+        res = _match(img, tmpl, template.mask)
 
-    result_dict = {}
-    confidence_list = []
-    for pt in zip(*loc[::-1]):  # pt是(x, y)左上角坐标
-        # 计算中心坐标
-        center_x = pt[0] + w_tmpl // 2
-        center_y = pt[1] + h_tmpl // 2
-        confidence = res[pt[1], pt[0]]  # y轴在前，x轴在后
-        result_dict[confidence] = Point(x= center_x, y= center_y)
-        confidence_list.append(confidence)
+    return peaks(res)
 
-    return result_dict, sorted(confidence_list, reverse=True)
+def _template_matching(
+    image: Image,
+    tmpl: TemplateLike,
+    min_confidence: float = 0.93,
+    max_results: int = None,
+    workers: int = 0,
+    region: tuple[int, int, int, int] = None,
+    near: Point | tuple[int, int] = None,
+    radius: int = 100,
+    color: bool = False,
+) -> tuple[dict[float, Point], list[float]]:
+    """在输入图片中查找模板图像，返回 (信心度 -> 坐标字典, 信心度降序列表)，参数同 _match_template。"""
+    
+    return _to_results(_match_template(image, tmpl, min_confidence, max_results, workers, region, near, radius, color))
 
-def template_matching(image: Image, tmpl: Image, min_confidence: float = 0.93) -> tuple[dict[float, Point], list[float]]:
+def template_matching(
+    image: Image,
+    tmpl: TemplateLike,
+    min_confidence: float = 0.93,
+    max_results: int = None,
+    workers: int = 0,
+    region: tuple[int, int, int, int] = None,
+    near: Point | tuple[int, int] = None,
+    radius: int = 100,
+    color: bool = False,
+) -> list[Point]:
     
-    results = _template_matching(image, tmpl, min_confidence)
+    return _to_points(_match_template(image, tmpl, min_confidence, max_results, workers, region, near, radius, color))
+
+def region_template_matching(image: Image, tmpl: TemplateLike, x1: int, y1: int, x2: int, y2: int, min_confidence: float = 0.93, color: bool = False) -> list[Point]:
+    """优先在区域 (x1, y1, x2, y2) 内查找模板，未找到时再搜索整张图片"""
     
-    return list(results[0].values())
+    return template_matching(image, tmpl, min_confidence, region=(x1, y1, x2, y2), color=color)
 
+def near_template_matching(image: Image, tmpl: TemplateLike, x: int, y: int, radius: int = 100, min_confidence: float = 0.93, color: bool = False) -> list[Point]:
+    """优先在 (x, y) 附近 radius 范围内查找模板，适合逐帧跟踪移动的目标，未找到时再搜索整张图片"""
+    
+    return template_matching(image, tmpl, min_confidence, near=(x, y), radius=radius, color=color)
 
-def _diff_size_template_matching(image: Image, tmpl: Image, min_confidence: float = 0.95) -> tuple[dict[float, Point], list[float]]:
-    """在输入图片中查找模板图像，支持多尺度匹配，并返回匹配结果。
+def color_template_matching(image: Image, tmpl: TemplateLike, min_confidence: float = 0.93, max_results: int = None) -> list[Point]:
+    """按 BGR 各通道匹配模板并校验平均颜色，只返回颜色也一致的结果"""
+    
+    return template_matching(image, tmpl, min_confidence, max_results, color=True)
+
+
+def _template_names(templates: list[TemplateLike] | dict[str, TemplateLike]) -> list[tuple[str, TemplateLike]]:
+    """为每个模板确定结果中使用的名称"""
+    if isinstance(templates, dict):
+        return list(templates.items())
+    
+    named = []
+    for index, tmpl in enumerate(templates, start=1):
+        name = tmpl if isinstance(tmpl, str) else getattr(tmpl, "name", None)
+        named.append((str(name) if name else str(index), tmpl))
+    return named
+
+def multi_template_matching(
+    image: Image,
+    templates: list[TemplateLike] | dict[str, TemplateLike],
+    min_confidence: float = 0.93,
+    first_match: bool = False,
+    workers: int = 0,
+    max_results: int = None,
+    color: bool = False,
+) -> dict[str, list[Point]]:
+    """在同一张图片中查找多个模板，图片只解码与灰度处理一次。
 
     Args:
         image (Image): 输入的图片，在该图片中查找模板图像。
-        tmpl (Image): 模板的图片，在输入图片中查找此模板。
-        min_confidence (float, optional): 最小信心度，该方法返回大于此信心度的结果。默认为0.95。
+        templates (list[TemplateLike] | dict[str, TemplateLike]): 模板列表，或 名称 -> 模板 的字典。
+        min_confidence (float, optional): 最小信心度。默认为0.93。
+        first_match (bool, optional): 按顺序返回第一个找到的模板后立即停止，适合判断当前所在界面。默认为False。
+        workers (int, optional): 大于 1 时各模板在线程池中并行匹配。默认为0。
+        max_results (int, optional): 每个模板最多返回的目标数量。默认为None (不限制)。
+        color (bool, optional): 按 BGR 各通道匹配并校验平均颜色。默认为False。
 
     Returns:
-        Tuple[Dict[float, Point], List[float]]: 
-            - result_dic: 字典，键为信心度，值为匹配位置的坐标元组。
-            - confidence_list: 信心度降序排列的列表。
+        dict[str, list[Point]]: 模板名称 -> 按信心度降序排列的中心点列表，未找到的模板不包含在内。
     """
     
-    image_bytes = image.image_bytes
-    tmpl_bytes = tmpl.image_bytes
+    img = image.array if color else image.gray
+    named = [(name, template_registry.resolve(tmpl)) for name, tmpl in _template_names(templates)]
     
-    img = PILImage.open(io.BytesIO(image_bytes))
-    template = PILImage.open(io.BytesIO(tmpl_bytes))
-    img = cv2.cvtColor(np.array(img), cv2.COLOR_RGB2BGR)
-    template = cv2.cvtColor(np.array(template), cv2.COLOR_RGB2BGR)
+    def match(template: Template) -> list[Point]:
+        if template.shape[0] > img.shape[0] or template.shape[1] > img.shape[1]:
+            return []
+        return _to_points(_screen_matches(image, _match_array(img, template, min_confidence, max_results)))
+    
+    results = {}
+    if workers > 1:
+        executor = _get_executor()
+        futures = [(name, executor.submit(match, template)) for name, template in named]
+        for index, (name, future) in enumerate(futures):
+            if points := future.result():
+                results[name] = points
+                if first_match:
+                    for _, pending in futures[index + 1:]:
+                        pending.cancel()
+                    break
+    else:
+        for name, template in named:
+            if points := match(template):
+                results[name] = points
+                if first_match:
+                    break
+    
+    return results
+
+def first_template_matching(
+    image: Image,
+    templates: list[TemplateLike] | dict[str, TemplateLike],
+    min_confidence: float = 0.93,
+) -> tuple[str, Point] | None:
+    """按顺序查找多个模板，返回第一个找到的模板名称与其位置，适合判断当前所在界面"""
+    
+    results = multi_template_matching(image, templates, min_confidence, first_match=True, max_results=1)
+    for name, points in results.items():
+        return name, points[0]
+    return None
+
+
+def _match_diff_size_template(
+    image: Image,
+    tmpl: TemplateLike,
+    min_confidence: float = 0.95,
+    max_results: int = None,
+    workers: int = 0,
+    stop_confidence: float = None,
+) -> Matches:
+    """在输入图片中查找模板图像，支持多尺度匹配，并返回匹配结果。
+
+    Args:
+        image (Image): 输入的图片，在该图片中查找模板图像。
+        tmpl (TemplateLike): 模板的图片、已注册的模板名或模板文件路径，在输入图片中查找此模板。
+        min_confidence (float, optional): 最小信心度，该方法返回大于此信心度的结果。默认为0.95。
+        max_results (int, optional): 最多返回的目标数量，不同尺度的重复结果会被合并。默认为None (不限制)。
+        workers (int, optional): 大于 1 时各尺度在线程池中并行匹配。默认为0。
+        stop_confidence (float, optional): 某个尺度达到该信心度后不再匹配更小的尺度。默认为None。
+
+    Returns:
+        Matches: 按信心度降序排列的匹配结果，重复目标已合并，中心点为原始截图中的坐标。
+    """
     
     # 灰度处理
-    gray_img = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
-    gray_tmpl = cv2.cvtColor(template, cv2.COLOR_BGR2GRAY)
+    gray_img = image.gray
+    template = template_registry.resolve(tmpl)
+    gray_tmpl = template.gray
     h_tmpl_orig, w_tmpl_orig = gray_tmpl.shape  # 原始模板尺寸
+    
+    scales = np.linspace(0.2, 1.0, 100)[::-1]
+    stop_index = len(scales)
+    stop_lock = Lock()
 
-    result_dict = {}
-    confidence_list = []
-
-    # 多尺度匹配
-    for scale in np.linspace(0.2, 1.0, 100)[::-1]:
+    def match(index: int, scale: float) -> np.ndarray:
+        nonlocal stop_index
+        
+        # 已有更大的尺度达到目标信心度
+        if index > stop_index:
+            return _NO_MATCHES
+        
         # 计算缩放后尺寸
         w_resized = int(w_tmpl_orig * scale)
         h_resized = int(h_tmpl_orig * scale)
         if w_resized == 0 or h_resized == 0:
-            continue  # 跳过无效尺寸
+            return _NO_MATCHES  # 跳过无效尺寸
         
         # 缩放模板
-        resized_tmpl = cv2.resize(gray_tmpl, (w_resized, h_resized))
+        resized_tmpl = template.scaled(scale)
         
         # 模板匹配
         result = cv2.matchTemplate(gray_img, resized_tmpl, cv2.TM_CCOEFF_NORMED)
-        loc = np.where(result >= min_confidence)
+        matches = _peaks(result, min_confidence, w_resized, h_resized)
         
-        # 处理匹配结果
-        for pt in zip(*loc[::-1]):
-            # 计算中心坐标
-            center_x = pt[0] + w_resized // 2
-            center_y = pt[1] + h_resized // 2
-            confidence = result[pt[1], pt[0]]
-            result_dict[confidence] = Point(x= center_x, y= center_y)
-            confidence_list.append(confidence)
+        if stop_confidence is not None and len(matches) and matches[:, 0].max() >= stop_confidence:
+            with stop_lock:
+                stop_index = min(stop_index, index)
+        return matches
 
-    return result_dict, sorted(confidence_list, reverse=True)
+    # 多尺度匹配
+    if workers > 1:
+        executor = _get_executor()
+        futures = [executor.submit(match, index, scale) for index, scale in enumerate(scales)]
+        scale_matches = [future.result() for future in futures]
+    else:
+        scale_matches = []
+        for index, scale in enumerate(scales):
+            if index > stop_index:
+                break
+            scale_matches.append(match(index, scale))
+
+    # 按尺度顺序合并，保证结果与串行一致
+    matches = np.vstack(scale_matches[:stop_index + 1])
+
+    return _screen_matches(image, _nms(matches, max_results))
+
+
+def _diff_size_template_matching(
+    image: Image,
+    tmpl: TemplateLike,
+    min_confidence: float = 0.95,
+    max_results: int = None,
+    workers: int = 0,
+    stop_confidence: float = None,
+) -> tuple[dict[float, Point], list[float]]:
+    """多尺度模板匹配，返回 (信心度 -> 坐标字典, 信心度降序列表)，参数同 _match_diff_size_template。"""
+    
+    return _to_results(_match_diff_size_template(image, tmpl, min_confidence, max_results, workers, stop_confidence))
+
+
+def _coarse_peaks(result: np.ndarray, threshold: float, max_peaks: int, w_tmpl: int, h_tmpl: int) -> list[tuple[float, int, int]]:
+    """在匹配结果中取出至多 max_peaks 个互不重叠的峰值 (信心度, x, y)"""
+    result = result.copy()
+    peaks = []
+    for _ in range(max_peaks):
+        _, max_val, _, (x, y) = cv2.minMaxLoc(result)
+        if max_val < threshold:
+            break
+        peaks.append((max_val, x, y))
+        result[max(0, y - h_tmpl // 2): y + h_tmpl // 2 + 1, max(0, x - w_tmpl // 2): x + w_tmpl // 2 + 1] = -1
+    return peaks
+
+def _match_pyramid_diff_size_template(
+    image: Image,
+    tmpl: TemplateLike,
+    min_confidence: float = 0.95,
+    max_results: int = None,
+    coarse_width: int = 480,
+    coarse_steps: int = 20,
+    candidates: int = 3,
+    max_peaks: int = 64,
+) -> Matches:
+    """多尺度模板匹配的金字塔版本，先在缩小的图片上粗略搜索尺度与位置，再只在候选附近以原分辨率精确匹配。
+
+    Args:
+        image (Image): 输入的图片，在该图片中查找模板图像。
+        tmpl (TemplateLike): 模板的图片、已注册的模板名或模板文件路径，在输入图片中查找此模板。
+        min_confidence (float, optional): 最小信心度，该方法返回大于此信心度的结果。默认为0.95。
+        max_results (int, optional): 最多返回的目标数量。默认为None (不限制)。
+        coarse_width (int, optional): 粗略搜索时图片缩放到的宽度。默认为480。
+        coarse_steps (int, optional): 粗略搜索的尺度数量。默认为20。
+        candidates (int, optional): 保留的候选尺度数量。默认为3。
+        max_peaks (int, optional): 每个尺度保留的候选位置上限，画面中有多个相同目标时需足够大。默认为64。
+
+    Returns:
+        Matches: 按信心度降序排列的匹配结果，重复目标已合并，中心点为原始截图中的坐标。
+    """
+    
+    gray_img = image.gray
+    template = template_registry.resolve(tmpl)
+    h_img, w_img = gray_img.shape
+
+    # 粗略搜索
+    factor = min(1.0, coarse_width / w_img)
+    small_img = cv2.resize(gray_img, (max(int(w_img * factor), 1), max(int(h_img * factor), 1)), interpolation=cv2.INTER_AREA)
+
+    coarse_scales = np.linspace(0.2, 1.0, coarse_steps)
+    coarse_results = []
+    for scale in coarse_scales:
+        small_tmpl = template.scaled(scale * factor, cv2.INTER_AREA)
+        h_small, w_small = small_tmpl.shape
+        if min(h_small, w_small) < 4 or h_small > small_img.shape[0] or w_small > small_img.shape[1]:
+            continue
+        result = cv2.matchTemplate(small_img, small_tmpl, cv2.TM_CCOEFF_NORMED)
+        # 缩小后的信心度普遍偏低，只保留与最高峰接近的位置，按分数挑选候选尺度
+        max_val = cv2.minMaxLoc(result)[1]
+        peaks = _coarse_peaks(result, max_val * 0.8, max_peaks, w_small, h_small)
+        if peaks:
+            coarse_results.append((max_val, scale, peaks))
+    
+    coarse_results.sort(key=lambda item: item[0], reverse=True)
+    
+    # 原分辨率精确匹配
+    fine_scales = np.linspace(0.2, 1.0, 100)
+    step = (coarse_scales[1] - coarse_scales[0]) if coarse_steps > 1 else 0
+    
+    matches = [_NO_MATCHES]
+    for _, coarse_scale, peaks in coarse_results[:candidates]:
+        for scale in fine_scales[np.abs(fine_scales - coarse_scale) <= step][::-1]:
+            resized_tmpl = template.scaled(scale)
+            h_resized, w_resized = resized_tmpl.shape
+            margin_x = w_resized // 2 + int(2 / factor)
+            margin_y = h_resized // 2 + int(2 / factor)
+            
+            for _, x, y in peaks:
+                x1 = max(0, int(x / factor) - margin_x)
+                y1 = max(0, int(y / factor) - margin_y)
+                x2 = min(w_img, int(x / factor) + w_resized + margin_x)
+                y2 = min(h_img, int(y / factor) + h_resized + margin_y)
+                if x2 - x1 < w_resized or y2 - y1 < h_resized:
+                    continue
+                
+                result = cv2.matchTemplate(gray_img[y1:y2, x1:x2], resized_tmpl, cv2.TM_CCOEFF_NORMED)
+                matches.append(_peaks(result, min_confidence, w_resized, h_resized, x1, y1))
+
+    return _screen_matches(image, _nms(np.vstack(matches), max_results))
+
+
+def _pyramid_diff_size_template_matching(
+    image: Image,
+    tmpl: TemplateLike,
+    min_confidence: float = 0.95,
+    max_results: int = None,
+) -> tuple[dict[float, Point], list[float]]:
+    """金字塔多尺度模板匹配，返回 (信心度 -> 坐标字典, 信心度降序列表)，参数同 _match_pyramid_diff_size_template。"""
+    
+    return _to_results(_match_pyramid_diff_size_template(image, tmpl, min_confidence, max_results))
 
 
-def diff_size_template_matching(image: Image, tmpl: Image, min_confidence: float = 0.93) -> tuple[dict[float, Point], list[float]]:
+def diff_size_template_matching(
+    image: Image,
+    tmpl: TemplateLike,
+    min_confidence: float = 0.93,
+    max_results: int = None,
+    pyramid: bool = False,
+    workers: int = 0,
+    stop_confidence: float = None,
+) -> list[Point]:
     
-    results = _diff_size_template_matching(image, tmpl, min_confidence)
+    if pyramid:
+        matches = _match_pyramid_diff_size_template(image, tmpl, min_confidence, max_results)
+    else:
+        matches = _match_diff_size_template(image, tmpl, min_confidence, max_results, workers, stop_confidence)
     
-    return list(results[0].values())
\ No newline at end of file
+    return _to_points(matches)
\ No newline at end of file
@@ -0,0 +1,173 @@
+from collections import OrderedDict
+from pathlib import Path
+from threading import Lock
+from typing import Any
+
+import cv2
+import numpy as np
+
+from model import Image
+
+def decode_image(data: bytes) -> np.ndarray:
+    """解码图片数据，保留透明通道"""
+    array = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED)
+    if array is None:
+        raise ValueError("无法解码图片")
+    return array
+
+class Template:
+    """解码后的模板，保存灰度图、遮罩与派生数据，避免每次匹配重复解码"""
+    max_scaled: int = 64
+    """缓存的缩放模板数量上限，超出时淘汰最久未使用的"""
+
+    def __init__(self, array: np.ndarray, name: str = None, path: Path = None, mtime: float = None, mask: np.ndarray = None):
+        """
+        Args:
+            array (np.ndarray): cv2 解码得到的图片 (灰度、BGR 或 BGRA)
+            name (str, optional): 模板名
+            path (Path, optional): 模板文件路径
+            mtime (float, optional): 载入时文件的修改时间
+            mask (np.ndarray, optional): 匹配遮罩，非 0 的像素参与匹配，默认取自透明通道
+        """
+        self.name = name
+        self.path = path
+        self.mtime = mtime
+
+        if mask is None and array.ndim == 3 and array.shape[2] == 4:
+            alpha = array[:, :, 3]
+            if alpha.min() < 255:
+                mask = np.where(alpha > 127, 255, 0).astype(np.uint8)
+        self.mask: np.ndarray | None = mask
+        """匹配遮罩，模板完全不透明时为 None"""
+
+        if array.ndim == 2:
+            self.color = cv2.cvtColor(array, cv2.COLOR_GRAY2BGR)
+        elif array.shape[2] == 4:
+            self.color = cv2.cvtColor(array, cv2.COLOR_BGRA2BGR)
+        else:
+            self.color = array
+        self.gray: np.ndarray = array if array.ndim == 2 else cv2.cvtColor(self.color, cv2.COLOR_BGR2GRAY)
+        self.cache: dict[Any, Any] = {}
+        """派生数据缓存，例如平均颜色与特征点"""
+        self._scaled: OrderedDict[tuple[float, int], np.ndarray] = OrderedDict()
+        self._scaled_lock = Lock()
+
+    @classmethod
+    def from_image(cls, image: Image) -> 'Template':
+        """由 Image 创建模板，已有编码数据时重新解码以保留透明通道"""
+        return cls(decode_image(image.image_bytes) if image.encoded else image.array, name=image.name)
+
+    @classmethod
+    def from_file(cls, path: Path, name: str = None) -> 'Template':
+        """由文件创建模板，支持非 ASCII 路径"""
+        path = Path(path)
+        return cls(decode_image(path.read_bytes()), name=name or path.stem, path=path, mtime=path.stat().st_mtime)
+
+    @property
+    def shape(self) -> tuple[int, int]:
+        """模板尺寸 (高, 宽)"""
+        return self.gray.shape[:2]
+
+    @property
+    def mean_color(self) -> tuple[float, float, float]:
+        """遮罩范围内的 BGR 平均颜色"""
+        if "mean_color" not in self.cache:
+            self.cache["mean_color"] = cv2.mean(self.color, self.mask)[:3]
+        return self.cache["mean_color"]
+
+    def scaled(self, scale: float, interpolation: int = cv2.INTER_LINEAR) -> np.ndarray:
+        """获取缩放后的灰度模板，最近使用的 max_scaled 个结果会被缓存"""
+        key = (round(scale, 4), interpolation)
+        with self._scaled_lock:
+            if key in self._scaled:
+                self._scaled.move_to_end(key)
+                return self._scaled[key]
+
+        height, width = self.shape
+        size = (max(int(width * scale), 1), max(int(height * scale), 1))
+        resized = cv2.resize(self.gray, size, interpolation=interpolation)
+
+        with self._scaled_lock:
+            self._scaled[key] = resized
+            while len(self._scaled) > self.max_scaled:
+                self._scaled.popitem(last=False)
+        return resized
+
+    def __str__(self):
+        return f"模板 {self.name if self.name else '未命名'} 尺寸 {self.shape[1]}x{self.shape[0]}"
+
+class TemplateRegistry:
+    """模板注册表，按路径与修改时间缓存解码后的模板，并支持按名称引用"""
+    def __init__(self):
+        self._templates: dict[Path, Template] = {}
+        self._names: dict[str, Path] = {}
+        self._lock = Lock()
+
+    def load(self, path: Path | str, name: str = None) -> Template:
+        """载入模板，文件未修改时直接返回缓存
+        Args:
+            path (Path | str): 模板文件路径
+            name (str, optional): 注册的名称
+        Returns:
+            Template: 模板
+        """
+        path = Path(path).resolve()
+        mtime = path.stat().st_mtime
+
+        with self._lock:
+            template = self._templates.get(path)
+            if template is None or template.mtime != mtime:
+                template = Template.from_file(path, name)
+                self._templates[path] = template
+            if name:
+                self._names[name] = path
+        return template
+
+    def register(self, name: str, path: Path | str) -> Template:
+        """以名称注册模板"""
+        return self.load(path, name)
+
+    def get(self, key: str, base: Path | str = None) -> Template:
+        """按名称或路径获取模板
+        Args:
+            key (str): 注册的名称或文件路径
+            base (Path | str, optional): 相对路径优先在该目录下查找，如脚本所在目录，其次相对当前工作目录
+        Returns:
+            Template: 模板
+        """
+        path = self._names.get(key)
+        if path is not None:
+            return self.load(path, key)
+
+        if base is not None and Path(base, key).exists():
+            return self.load(Path(base, key))
+
+        if Path(key).exists():
+            return self.load(key)
+
+        raise KeyError(f"模板 {key} 未注册且文件不存在")
+
+    def resolve(self, tmpl: 'Template | Image | Path | str', base: Path | str = None) -> Template:
+        """将各种模板参数统一转换为 Template，base 同 get"""
+        if isinstance(tmpl, Template):
+            return tmpl
+        if isinstance(tmpl, (str, Path)):
+            return self.get(str(tmpl), base)
+        return Template.from_image(tmpl)
+
+    def clear(self) -> None:
+        """清空注册表"""
+        with self._lock:
+            self._templates.clear()
+            self._names.clear()
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._names
+
+    def __len__(self) -> int:
+        return len(self._templates)
+
+template_registry = TemplateRegistry()
+"""
+全局模板注册表
+"""
@@ -0,0 +1,187 @@
+from threading import Event
+from typing import Any, Callable
+import time
+
+import numpy as np
+
+from model import Image, Point
+from .image import image_ocr, ocr_index, template_matching, diff_regions, Template
+
+def next_frame(device: Any, after: int, deadline: float) -> tuple[Image | None, int]:
+    """获取新的一帧，设备持续截图时直接使用缓冲区中的最新帧
+    Args:
+        device (Any): 设备
+        after (int): 上一次获取的帧序号，只在持续截图时有效
+        deadline (float): 等待新一帧的截止时间 (time.monotonic)
+    Returns:
+        tuple[Image | None, int]: 截图与帧序号，获取失败时截图为 None
+    """
+    if getattr(device, "streaming", False):
+        frame = device.wait_frame(after, max(deadline - time.monotonic(), 0))
+        return (frame.image, frame.index) if frame else (None, after)
+
+    result = device.screenshot()
+    return (result[-1] if isinstance(result, tuple) else None), after
+
+def _same_frame(before: Image | None, after: Image) -> bool:
+    """两帧是否完全相同，在原始分辨率下逐像素比较，任何细小的变化都视为不同"""
+    return before is not None and np.array_equal(before.array, after.array)
+
+def wait_until(
+    device: Any,
+    check: Callable[[Image], Any],
+    timeout: float,
+    interval: float,
+    cancel_event: Event | None = None,
+    cancel: Callable | None = None,
+    skip_unchanged: bool = True,
+) -> Any:
+    """反复截图直到 check 返回真值
+    Args:
+        device (Any): 设备
+        check (Callable[[Image], Any]): 检查函数，返回真值时结束等待
+        timeout (float): 超时时间 (秒)
+        interval (float): 初始的截图间隔 (秒)，画面未变化时逐渐增大到 1 秒
+        cancel_event (Event | None): 设置后立即返回
+        cancel (Callable | None): 返回真值时取消等待
+        skip_unchanged (bool): 与上次检查的画面完全相同时跳过检查，检查本身比逐像素比较更快时应关闭
+    Returns:
+        Any: check 的结果，超时或取消时为 None
+    """
+    cancel_event = cancel_event or Event()
+    deadline = time.monotonic() + timeout
+    max_interval = max(interval, 1.0)
+    delay = interval
+    frame_index = 0
+    checked: Image | None = None
+
+    while not (cancel_event.is_set() or (cancel and cancel())):
+        image, frame_index = next_frame(device, frame_index, deadline)
+
+        if image is not None:
+            # 画面与上次检查时完全相同则不必重复识别
+            if skip_unchanged and _same_frame(checked, image):
+                delay = min(delay * 2, max_interval)
+            else:
+                checked = image
+                if result := check(image):
+                    return result
+                delay = interval
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        cancel_event.wait(min(delay, remaining))
+
+    return None
+
+def wait_for_text(
+    device: Any,
+    text: str,
+    timeout: float = 10.0,
+    interval: float = 0.2,
+    lang: str = "ch",
+    cancel_event: Event | None = None,
+    cancel: Callable | None = None,
+    ocr: Callable = image_ocr,
+) -> Point | None:
+    """等待画面中出现指定文字
+    Args:
+        device (Any): 设备
+        text (str): 目标文字，优先全词匹配，其次包含匹配
+        timeout (float): 超时时间 (秒)
+        interval (float): 初始的截图间隔 (秒)
+        lang (str): 识别语言
+        cancel_event (Event | None): 设置后立即返回
+        cancel (Callable | None): 返回真值时取消等待
+        ocr (Callable): 识别函数，如 image_ocr 或 batched_image_ocr
+    Returns:
+        Point | None: 文字的中心点，超时时为 None
+    """
+    def check(image: Image) -> Point | None:
+        result = ocr_index(ocr(image, lang))
+        return result.find(text) or next(iter(result.contains(text)), None)
+
+    return wait_until(device, check, timeout, interval, cancel_event, cancel)
+
+def wait_for_template(
+    device: Any,
+    template: Template,
+    timeout: float = 10.0,
+    interval: float = 0.2,
+    min_confidence: float = 0.93,
+    cancel_event: Event | None = None,
+    cancel: Callable | None = None,
+) -> Point | None:
+    """等待画面中出现模板
+    Args:
+        device (Any): 设备
+        template (Template): 模板
+        timeout (float): 超时时间 (秒)
+        interval (float): 初始的截图间隔 (秒)
+        min_confidence (float): 最小信心度
+        cancel_event (Event | None): 设置后立即返回
+        cancel (Callable | None): 返回真值时取消等待
+    Returns:
+        Point | None: 模板的中心点，超时时为 None
+    """
+    def check(image: Image) -> Point | None:
+        points = template_matching(image, template, min_confidence, max_results=1)
+        return points[0] if points else None
+
+    return wait_until(device, check, timeout, interval, cancel_event, cancel)
+
+def wait_for_color(
+    device: Any,
+    x: int,
+    y: int,
+    color: str,
+    timeout: float = 10.0,
+    interval: float = 0.2,
+    tolerance: int = 0,
+    cancel_event: Event | None = None,
+    cancel: Callable | None = None,
+) -> bool:
+    """等待像素点变为指定颜色，每一帧都检查
+    Args:
+        device (Any): 设备
+        x (int): 像素点的 x 坐标
+        y (int): 像素点的 y 坐标
+        color (str): 16进制颜色代码，如 "#FF0000"
+        timeout (float): 超时时间 (秒)
+        interval (float): 截图间隔 (秒)
+        tolerance (int): 每个通道允许的最大差值
+        cancel_event (Event | None): 设置后立即返回
+        cancel (Callable | None): 返回真值时取消等待
+    Returns:
+        bool: 超时前颜色是否匹配
+    """
+    check = lambda image: image.check_colors([(x, y)], color, tolerance)[0]
+    return bool(wait_until(device, check, timeout, interval, cancel_event, cancel, skip_unchanged=False))
+
+def wait_for_change(
+    device: Any,
+    timeout: float = 10.0,
+    interval: float = 0.2,
+    threshold: int = 10,
+    cancel_event: Event | None = None,
+    cancel: Callable | None = None,
+) -> list[tuple[int, int, int, int]] | None:
+    """等待画面相对当前画面发生变化，在原始分辨率下逐通道比较
+    Args:
+        device (Any): 设备
+        timeout (float): 超时时间 (秒)
+        interval (float): 初始的截图间隔 (秒)
+        threshold (int): 任一通道的差值超过该值视为变化
+        cancel_event (Event | None): 设置后立即返回
+        cancel (Callable | None): 返回真值时取消等待
+    Returns:
+        list[tuple[int, int, int, int]] | None: 变化区域 (x1, y1, x2, y2) 列表，超时时为 None
+    """
+    deadline = time.monotonic() + timeout
+    start, _ = next_frame(device, 0, deadline)
+    if start is None:
+        return None
+
+    check = lambda image: diff_regions(start, image, threshold, full=True)
+    return wait_until(device, check, max(deadline - time.monotonic(), 0), interval, cancel_event, cancel)
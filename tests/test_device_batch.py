@@ -0,0 +1,50 @@
+from actuator.base import Devices
+from actuator.base.device import parse_gestures
+from actuator.model import Point
+
+from time import monotonic
+
+import pytest
+
+class RecordDevice(Devices):
+    def __init__(self):
+        super().__init__("record")
+        self.actions = []
+
+    def click(self, x, y):
+        self.actions.append(("tap", x, y))
+
+    def swipe(self, x1, y1, x2, y2, time):
+        self.actions.append(("swipe", x1, y1, x2, y2, time))
+
+    def keyevent(self, key_id):
+        self.actions.append(("key", key_id))
+
+def test_parse_gestures():
+    gestures = parse_gestures([["tap", 1, 2], ["click", Point(x=3, y=4)], ["swipe", Point(x=1, y=1), Point(x=2, y=2)], ["keyevent", 4], ["wait", 0.1]])
+    assert gestures == [("tap", [1, 2]), ("tap", [3, 4]), ("swipe", [1, 1, 2, 2, 0.3]), ("key", [4]), ("sleep", [0.1])]
+
+    with pytest.raises(ValueError):
+        parse_gestures([["tap", 1]])
+    with pytest.raises(ValueError):
+        parse_gestures([["jump", 1, 2]])
+
+def test_batch():
+    device = RecordDevice()
+    start = monotonic()
+    device.batch([["tap", 1, 2], ["sleep", 0.05], ["swipe", 1, 2, 3, 4, 0.2], ["key", 4]])
+    assert monotonic() - start >= 0.05
+    assert device.actions == [("tap", 1, 2), ("swipe", 1, 2, 3, 4, 0.2), ("key", 4)]
+
+def test_batch_unsupported():
+    class NoKeyDevice(Devices):
+        def __init__(self):
+            super().__init__("nokey")
+            self.actions = []
+
+        def click(self, x, y):
+            self.actions.append(("tap", x, y))
+
+    device = NoKeyDevice()
+    assert "key" in str(device.batch([["tap", 1, 2], ["key", 4]]))
+    assert device.actions == [], "存在不支持的手势时不应执行任何手势"
@@ -0,0 +1,87 @@
+from actuator.base import Devices
+from actuator.model import Image
+
+from threading import Event
+from time import sleep
+
+import numpy as np
+
+class FakeDevice(Devices):
+    def __init__(self):
+        super().__init__("fake")
+        self.captures = 0
+
+    def _capture(self) -> Image:
+        self.captures += 1
+        sleep(0.01)
+        return Image.from_array(np.full((10, 10, 3), self.captures * 50 % 256, np.uint8))
+
+class SlowDevice(FakeDevice):
+    """第一次截图一直阻塞到 release 被设置"""
+    def __init__(self):
+        super().__init__()
+        self.entered = Event()
+        self.release = Event()
+
+    def _capture(self) -> Image:
+        if not self.entered.is_set():
+            self.entered.set()
+            self.release.wait(5)
+            return Image.from_array(np.full((10, 10, 3), 7, np.uint8))
+        return super()._capture()
+
+def test_stream():
+    device = FakeDevice()
+    assert not device.streaming and device.latest_frame() is None and device.wait_frame() is None
+
+    device.start_stream(size=3)
+    try:
+        first = device.wait_frame(timeout=2)
+        assert first is not None and device.streaming
+        second = device.wait_frame(first.index, timeout=2)
+        assert second.index > first.index and second.timestamp >= first.timestamp, "未等待新的一帧"
+
+        sleep(0.1)
+        frames = device.recent_frames()
+        assert len(frames) == 3, "环形缓冲区大小错误"
+        assert [frame.index for frame in frames] == sorted(frame.index for frame in frames)
+        assert device._stream_image() is not None
+    finally:
+        device.stop_stream()
+
+    assert not device.streaming and device.wait_frame(timeout=0.1) is None
+
+def test_screen_changed():
+    device = FakeDevice()
+    assert device.screen_token() == 0 and device.changed_regions(0) == []
+
+    device._track_frame(device._capture())
+    token = device.screen_token()
+    device._track_frame(device._capture())
+    assert device.screen_changed(token) and device.changed_regions(token) == [(0, 0, 10, 10)]
+    assert not device.screen_changed(device.screen_token())
+
+def test_restart_stream_with_slow_capture():
+    device = SlowDevice()
+    device.start_stream()
+    assert device.entered.wait(2)
+    old = device._stream_thread
+    device.stop_stream(timeout=0.05)
+    assert old.is_alive() and not device.streaming
+
+    device.start_stream()
+    try:
+        assert device.wait_frame(timeout=2) is not None
+        device.release.set()
+        old.join(2)
+        assert not old.is_alive(), "旧的截图线程没有退出"
+
+        sleep(0.05)
+        assert all(frame.image.array[0, 0, 0] != 7 for frame in device.recent_frames()), "旧的截图线程写入了新的缓冲区"
+    finally:
+        device.stop_stream()
+
+def test_stream_unsupported():
+    device = Devices("plain")
+    assert "不支持" in str(device.start_stream())
+    assert not device.streaming and device._stream_thread is None
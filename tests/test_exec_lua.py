@@ -0,0 +1,118 @@
+import pytest
+
+exec_lua = pytest.importorskip("actuator.run_script.exec_lua", reason="缺少设备后端依赖")
+
+from actuator.base import Devices
+from actuator.model import Image
+
+from threading import Thread
+from time import sleep, monotonic
+
+import cv2
+import numpy as np
+
+class ChangingDevice(Devices):
+    """第二次截图起左上角出现一个白色方块"""
+    def __init__(self):
+        super().__init__("fake")
+        self.captures = 0
+
+    def screenshot(self):
+        self.captures += 1
+        array = np.zeros((50, 50, 3), np.uint8)
+        if self.captures > 1:
+            array[10:20, 10:20] = 255
+        image = Image.from_array(array)
+        self._track_frame(image)
+        return image
+
+class StreamDevice(Devices):
+    def __init__(self):
+        super().__init__("stream")
+
+    def _capture(self) -> Image:
+        sleep(0.01)
+        return Image.from_array(np.zeros((10, 10, 3), np.uint8))
+
+class StillDevice(Devices):
+    def __init__(self):
+        super().__init__("still")
+
+    def screenshot(self):
+        return None, Image.from_array(np.zeros((10, 10, 3), np.uint8))
+
+@pytest.fixture
+def runtime(tmp_path):
+    runtime = exec_lua.LuaScriptRuntime()
+    runtime.init_lua(tmp_path / "main.lua")
+    return runtime
+
+def test_device_list_result(runtime):
+    runtime.lua.globals()["Device"].update_device(ChangingDevice())
+    assert runtime.run("""
+        Device.screenshot()
+        local token = Device.screen_token()
+        Device.screenshot()
+        regions = Device.changed_regions(token)
+        count = #regions
+        x1, y1, x2, y2 = regions[1][1], regions[1][2], regions[1][3], regions[1][4]
+    """) is None, runtime.buffer.read()
+
+    lua_globals = runtime.lua.globals()
+    assert lua_globals.count == 1, "列表结果应转换为 Lua 表"
+    assert (lua_globals.x1, lua_globals.y1, lua_globals.x2, lua_globals.y2) == (9, 9, 21, 21)
+
+def test_device_frames(runtime):
+    device = StreamDevice()
+    runtime.lua.globals()["Device"].update_device(device)
+    device.start_stream(size=2)
+    try:
+        assert device.wait_frame(timeout=2) and device.wait_frame(1, timeout=2)
+        assert runtime.run("""
+            frames = Device.recent_frames()
+            count = #frames
+            first, last = frames[1].index, frames[count].index
+            latest = Device.latest_frame().index
+        """) is None, runtime.buffer.read()
+    finally:
+        device.stop_stream()
+
+    lua_globals = runtime.lua.globals()
+    assert lua_globals.count == 2
+    assert lua_globals.first < lua_globals.last <= lua_globals.latest
+
+def test_cancel_wait(runtime, monkeypatch):
+    monkeypatch.setattr(exec_lua.devices_manager, "device", StillDevice())
+    thread = Thread(target=runtime.run, args=('found = wait_for_color(0, 0, "#FFFFFF", 10, 0.01)',))
+    start = monotonic()
+    thread.start()
+
+    while runtime.cancel_event not in exec_lua.cancel_events and monotonic() - start < 2:
+        sleep(0.01)
+    sleep(0.05)
+    # 与停止脚本时相同，设置所有正在运行的脚本的取消事件
+    for event in exec_lua.cancel_events:
+        event.set()
+    thread.join(2)
+
+    assert not thread.is_alive() and monotonic() - start < 2, "取消后等待未立即返回"
+    assert runtime.lua.globals().found is False
+    assert runtime.cancel_event not in exec_lua.cancel_events, "脚本结束后取消事件未移除"
+
+def test_template_path_relative_to_script(runtime, tmp_path, monkeypatch):
+    screen = np.full((100, 200, 3), 40, np.uint8)
+    cv2.circle(screen, (150, 60), 12, (0, 200, 255), -1)
+    cv2.imwrite(str(tmp_path / "screen.png"), screen)
+    cv2.imwrite(str(tmp_path / "button.png"), screen[45:75, 135:165])
+    monkeypatch.chdir(tmp_path.parent)
+
+    assert runtime.run("""
+        local screen = Image.open("screen.png")
+        local points = Image.template_matching(screen, "button.png", 0.9)
+        x, y = points[1].x, points[1].y
+        found = Image.multi_template_matching(screen, {"button.png"}, 0.9)["button.png"] ~= nil
+    """) is None, runtime.buffer.read()
+
+    lua_globals = runtime.lua.globals()
+    assert (lua_globals.x, lua_globals.y) == (150, 60), "模板路径未相对脚本目录查找"
+    assert lua_globals.found
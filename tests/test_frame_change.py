@@ -0,0 +1,34 @@
+from actuator.utils.image import FrameChangeDetector, diff_regions
+from actuator.model import Image
+
+import numpy as np
+
+def frame(box: tuple[int, int, int, int] = None) -> Image:
+    array = np.full((720, 1280, 3), 40, np.uint8)
+    if box:
+        x1, y1, x2, y2 = box
+        array[y1:y2, x1:x2] = 255
+    return Image.from_array(array)
+
+def test_frame_change_detector():
+    detector = FrameChangeDetector()
+    assert detector.token() == 0 and not detector.changed(0)
+
+    detector.update(frame())
+    token = detector.token()
+    assert not detector.changed(token)
+
+    detector.update(frame())
+    assert not detector.changed(token), "画面相同时不应视为变化"
+
+    detector.update(frame((600, 300, 700, 400)))
+    regions = detector.changed_regions(token)
+    assert len(regions) == 1, "变化区域数量错误"
+    x1, y1, x2, y2 = regions[0]
+    assert x1 <= 600 and y1 <= 300 and x2 >= 700 and y2 >= 400, "变化区域未覆盖变化的像素"
+    assert x2 - x1 < 200 and y2 - y1 < 200, "变化区域过大"
+    assert detector.changed_regions(-1) == [(0, 0, 1280, 720)], "过期的令牌应视为整个画面变化"
+
+def test_diff_regions():
+    assert diff_regions(frame(), frame()) == []
+    assert len(diff_regions(frame(), frame((10, 10, 50, 50)))) == 1
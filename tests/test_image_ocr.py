@@ -1,8 +1,12 @@
-from actuator.utils.image import image_ocr, exact_match, simple_fuzzy_match, fuzzy_match, regex_match
+from actuator.utils.image import image_ocr, image_ocr_regions, image_ocr_detect, image_ocr_recognize, exact_match, simple_fuzzy_match, fuzzy_match, regex_match, ocr_index, OcrEnginePool, OcrCache, OcrBatchService, batch_image_ocr, content_hash
+from actuator.model import Image
 
 from pathlib import Path
 
+import importlib
 import pytest
+import cv2
+import numpy as np
 
 path = Path(__file__).parent / "test_image"
 
@@ -39,4 +43,145 @@ class TestOcr:
         assert fuzzy_match(result, "项目") != None, "OCR 识别失败"
 
     def test_regex_match(self, result):
-        assert regex_match(result, r"项目") != None, "OCR 识别失败"
\ No newline at end of file
+        assert regex_match(result, r"项目") != None, "OCR 识别失败"
+
+class FakePaddleOCR:
+    loaded = 0
+
+    def __init__(self, **kwargs):
+        FakePaddleOCR.loaded += 1
+        self.kwargs = kwargs
+
+    def ocr(self, image_input, **kwargs):
+        return [[[[[0, 0], [10, 0], [10, 10], [0, 10]], ("新建项目", 0.99)]]]
+
+def test_ocr_engine_pool(monkeypatch):
+    module = importlib.import_module("actuator.utils.image.image_ocr")
+    monkeypatch.setattr(module, "PaddleOCR", FakePaddleOCR)
+    FakePaddleOCR.loaded = 0
+
+    pool = OcrEnginePool()
+    assert pool.get("ch") is pool.get("ch"), "引擎未复用"
+    assert pool.get("en") is not pool.get("ch"), "不同语言不应共用引擎"
+    assert FakePaddleOCR.loaded == 2, "模型被重复加载"
+
+def test_image_ocr_regions(monkeypatch):
+    module = importlib.import_module("actuator.utils.image.image_ocr")
+    monkeypatch.setattr(module, "PaddleOCR", FakePaddleOCR)
+    monkeypatch.setattr(module, "ocr_engine_pool", OcrEnginePool())
+
+    image = Image(cv2.imencode(".png", np.zeros((200, 300, 3), np.uint8))[1].tobytes())
+    result = image_ocr_regions(image, [[100, 50, 200, 150], [0, 0, 50, 50]])
+
+    assert len(result[0]) == 2, "区域识别结果数量错误"
+    assert exact_match(result, "新建项目").to_tuple() == (105, 55), "区域坐标未换算回原图"
+
+def test_ocr_cache(monkeypatch):
+    module = importlib.import_module("actuator.utils.image.image_ocr")
+    monkeypatch.setattr(module, "PaddleOCR", FakePaddleOCR)
+    monkeypatch.setattr(module, "ocr_engine_pool", OcrEnginePool())
+    monkeypatch.setattr(module, "ocr_result_cache", OcrCache(max_size=2))
+
+    array = np.zeros((64, 64, 3), np.uint8)
+    array[:, 32:] = 255
+    image = Image(cv2.imencode(".png", array)[1].tobytes())
+
+    assert image_ocr(image) is image_ocr(image), "相同画面未命中缓存"
+    assert module.ocr_result_cache.stats()["hits"] == 1
+
+    cache = OcrCache(perceptual=True)
+    image_key, _ = cache.get(image)
+    cache.put(image_key, "result")
+    array[0, 0] = 10
+    assert cache.get(Image(cv2.imencode(".png", array)[1].tobytes()))[1] == "result", "近似画面未命中缓存"
+
+    pixels = np.arange(64 * 48 * 3, dtype=np.uint8)
+    wide, tall = Image.from_array(pixels.reshape(48, 64, 3)), Image.from_array(pixels.reshape(64, 48, 3))
+    assert content_hash(wide) != content_hash(tall), "尺寸不同的画面共用了缓存"
+    assert content_hash(wide) == content_hash(Image.from_array(pixels.reshape(48, 64, 3).copy()))
+
+class FakeBatchPaddleOCR(FakePaddleOCR):
+    calls = []
+
+    def ocr(self, image_input, det=True, rec=True, cls=True):
+        FakeBatchPaddleOCR.calls.append((det, rec))
+        if not rec:
+            return [[[[10, 10], [60, 10], [60, 30], [10, 30]]]]
+        return [[("新建项目", 0.99) for _ in image_input]]
+
+def test_batch_image_ocr(monkeypatch):
+    module = importlib.import_module("actuator.utils.image.ocr_batch")
+    monkeypatch.setattr(importlib.import_module("actuator.utils.image.image_ocr"), "PaddleOCR", FakeBatchPaddleOCR)
+    monkeypatch.setattr(module, "ocr_engine_pool", OcrEnginePool())
+    FakeBatchPaddleOCR.calls = []
+
+    images = [Image(cv2.imencode(".png", np.zeros((100, 100, 3), np.uint8))[1].tobytes()) for _ in range(3)]
+    results = batch_image_ocr(images)
+
+    assert len(results) == 3, "批量识别结果数量错误"
+    assert FakeBatchPaddleOCR.calls.count((False, True)) == 1, "文字识别未合并为一次推理"
+    assert exact_match(results[2], "新建项目").to_tuple() == (35, 20)
+
+    service = OcrBatchService(window=0.2)
+    try:
+        monkeypatch.setattr(module, "batch_image_ocr", lambda images, lang, return_exceptions: [[[]] for _ in images])
+        futures = [service.submit(image) for image in images]
+        assert [future.result(timeout=5) for future in futures] == [[[]]] * 3
+    finally:
+        service.shutdown(timeout=5)
+    assert service._thread is None
+
+class FailingPaddleOCR(FakeBatchPaddleOCR):
+    def ocr(self, image_input, det=True, rec=True, cls=True):
+        if not rec and image_input.mean() == 255:
+            raise RuntimeError("检测失败")
+        return super().ocr(image_input, det, rec, cls)
+
+def test_batch_image_ocr_error(monkeypatch):
+    module = importlib.import_module("actuator.utils.image.ocr_batch")
+    monkeypatch.setattr(importlib.import_module("actuator.utils.image.image_ocr"), "PaddleOCR", FailingPaddleOCR)
+    monkeypatch.setattr(module, "ocr_engine_pool", OcrEnginePool())
+
+    images = [Image(cv2.imencode(".png", np.full((100, 100, 3), value, np.uint8))[1].tobytes()) for value in (0, 255, 0)]
+    with pytest.raises(RuntimeError):
+        batch_image_ocr(images)
+
+    service = OcrBatchService(window=0.2)
+    try:
+        futures = [service.submit(image) for image in images]
+        with pytest.raises(RuntimeError):
+            futures[1].result(timeout=5)
+        assert exact_match(futures[0].result(timeout=5), "新建项目").to_tuple() == (35, 20), "其他图片的请求受到了影响"
+        assert exact_match(futures[2].result(timeout=5), "新建项目").to_tuple() == (35, 20)
+    finally:
+        service.shutdown(timeout=5)
+
+def test_image_ocr_modes(monkeypatch):
+    module = importlib.import_module("actuator.utils.image.image_ocr")
+    monkeypatch.setattr(module, "PaddleOCR", FakeBatchPaddleOCR)
+    monkeypatch.setattr(module, "ocr_engine_pool", OcrEnginePool())
+    FakeBatchPaddleOCR.calls = []
+
+    image = Image(cv2.imencode(".png", np.zeros((32, 128, 3), np.uint8))[1].tobytes())
+
+    assert image_ocr_detect(image) == [[[10, 10], [60, 10], [60, 30], [10, 30]]]
+    assert image_ocr_recognize(image) == ("新建项目", 0.99)
+    assert FakeBatchPaddleOCR.calls == [(True, False), (False, True)], "识别模式错误"
+
+def test_cropped_image_ocr(monkeypatch):
+    module = importlib.import_module("actuator.utils.image.image_ocr")
+    monkeypatch.setattr(module, "PaddleOCR", FakeBatchPaddleOCR)
+    monkeypatch.setattr(module, "ocr_engine_pool", OcrEnginePool())
+    monkeypatch.setattr(module, "ocr_result_cache", OcrCache())
+
+    screen = Image.from_array(np.zeros((200, 300, 3), np.uint8))
+    cropped = screen.view(100, 50, 300, 200)
+
+    assert image_ocr_detect(cropped) == [[[110, 60], [160, 60], [160, 80], [110, 80]]], "检测框未换算为原始截图中的坐标"
+
+    monkeypatch.setattr(module, "PaddleOCR", FakePaddleOCR)
+    monkeypatch.setattr(module, "ocr_engine_pool", OcrEnginePool())
+    assert exact_match(image_ocr_regions(cropped, [150, 100, 250, 200]), "新建项目").to_tuple() == (155, 105), "区域应为原始截图中的坐标"
+    assert exact_match(image_ocr(cropped), "新建项目").to_tuple() == (105, 55), "识别结果未换算为原始截图中的坐标"
+    assert ocr_index(image_ocr(cropped)).find("新建项目").to_tuple() == (105, 55)
+    assert exact_match(image_ocr(screen.view(0, 0, 200, 150)), "新建项目").to_tuple() == (5, 5), "不同位置的相同画面共用了缓存"
@@ -0,0 +1,62 @@
+from actuator.model import Image, Point
+
+import cv2
+import numpy as np
+
+def screen() -> np.ndarray:
+    array = np.zeros((100, 200, 3), np.uint8)
+    array[10:20, 30:40] = (0, 0, 255)
+    return array
+
+def test_image_array():
+    image_bytes = cv2.imencode(".png", screen())[1].tobytes()
+    image = Image(image_bytes)
+    assert image.image_bytes == image_bytes, "编码数据被修改"
+    assert image.resolution == (200, 100)
+    assert image.array is image.array, "解码结果未缓存"
+    assert image.check_color(35, 15, "#FF0000") and not image.check_color(0, 0, "#FF0000"), "颜色判断错误"
+
+def test_image_operations():
+    image = Image.from_array(screen())
+    assert not image.encoded and image.get_resolution() == (200, 100)
+
+    cropped = Image().crop(image, 30, 10, 40, 20)
+    assert cropped.resolution == (10, 10) and not cropped.encoded, "裁切后不应编码"
+    assert cropped.check_color(0, 0, "#FF0000")
+
+    filled = image.fill_color(0, 0, 9, 9, "#00FF00")
+    assert filled.check_color(9, 9, "#00FF00") and not filled.check_color(10, 10, "#00FF00"), "填充范围错误"
+    assert not Image.from_array(screen()).check_color(0, 0, "#00FF00"), "填充修改了原数组"
+
+    decoded = cv2.imdecode(np.frombuffer(filled.image_bytes, np.uint8), cv2.IMREAD_COLOR)
+    assert np.array_equal(decoded, filled.array), "编码结果与像素数组不一致"
+
+def test_image_view():
+    image = Image.from_array(screen())
+    view = image.view(20, 5, 60, 45)
+    assert np.shares_memory(view.array, image.array), "裁切复制了像素数组"
+    assert view.offset == (20, 5) and view.resolution == (40, 40)
+    assert view.check_color(15, 10, "#FF0000")
+
+    nested = view.view(10, 5, 30, 25)
+    assert nested.offset == (30, 10), "嵌套裁切的偏移错误"
+    assert nested.to_screen(Point(x=5, y=5)).to_tuple() == (35, 15)
+    assert [point.to_tuple() for point in nested.to_screen([Point(x=0, y=0), Point(x=1, y=2)])] == [(30, 10), (31, 12)]
+
+    cropped = Image().crop(image, 30, 10, 40, 20)
+    assert cropped.offset == (30, 10) and np.shares_memory(cropped.array, image.array)
+
+def test_image_check_colors():
+    image = Image.from_array(screen())
+    points = [Point(x=35, y=15), (0, 0), [31, 11]]
+    assert image.check_colors(points, ["#FF0000", "#000000", "#FF0000"]) == [True, True, True]
+    assert image.check_colors(points, "#FF0000") == [True, False, True]
+    assert image.check_colors([(0, 0)], "#050505", tolerance=5) == [True] and image.check_colors([(0, 0)], "#060000", tolerance=5) == [False]
+    assert image.get_colors(points) == ["#FF0000", "#000000", "#FF0000"]
+
+    signature = image.pixel_signature(points)
+    noisy = screen()
+    noisy[0, 0] = (3, 3, 3)
+    assert Image.from_array(noisy).pixel_signature(points) == signature, "颜色抖动改变了签名"
+    noisy[15, 35] = (0, 255, 0)
+    assert Image.from_array(noisy).pixel_signature(points) != signature, "界面变化未改变签名"
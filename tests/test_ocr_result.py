@@ -0,0 +1,42 @@
+from actuator.utils.image import OcrResult, exact_match, simple_fuzzy_match, fuzzy_match, fuzzy_scores, fuzzy_match_top, fuzzy_match_many
+
+def word(x: int, y: int, text: str) -> list:
+    return [[[x - 10, y - 5], [x + 10, y - 5], [x + 10, y + 5], [x - 10, y + 5]], (text, 0.99)]
+
+ocr_result = [[
+    word(100, 100, "确定"),
+    word(300, 100, "取消"),
+    word(500, 800, "确定"),
+    word(700, 400, "Start Game"),
+]]
+
+def test_find():
+    result = OcrResult(ocr_result)
+
+    assert result.find("确定").to_tuple() == (100, 100)
+    assert [point.to_tuple() for point in result.find_all("确定")] == [(100, 100), (500, 800)]
+    assert result.find_all("start game", ignore_case=True)[0].to_tuple() == (700, 400)
+    assert result.contains("game")[0].to_tuple() == (700, 400)
+    assert result.find_many(["取消", "返回"])["返回"] is None
+
+def test_spatial():
+    result = OcrResult(ocr_result)
+
+    assert result.nearest(480, 780).to_tuple() == (500, 800)
+    assert result.nearest(0, 0).to_tuple() == (100, 100)
+    assert result.nearest(480, 600, "确定").to_tuple() == (500, 800)
+    assert result.texts_in_rect(0, 0, 400, 200) == ["确定", "取消"]
+
+def test_match_compatibility():
+    result = OcrResult(ocr_result)
+
+    assert exact_match(result, "取消").to_tuple() == (300, 100)
+    assert simple_fuzzy_match(result, "START").to_tuple() == (700, 400)
+    assert fuzzy_match(result, "Start Gane").to_tuple() == (700, 400)
+
+def test_fuzzy_scores():
+    matches = fuzzy_scores(ocr_result, "确认", limit=2)
+
+    assert [point.to_tuple() for point, _ in matches] == [(100, 100), (500, 800)]
+    assert fuzzy_match_top(ocr_result, "确认", score_cutoff=90) == []
+    assert fuzzy_match_many(ocr_result, ["取消", "start"])["start"].to_tuple() == (700, 400)
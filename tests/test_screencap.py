@@ -0,0 +1,38 @@
+import pytest
+
+pytest.importorskip("actuator.devices", reason="缺少设备后端依赖")
+
+from actuator.devices.adb.screencap import parse_screencap, PIXEL_FORMAT_RGBA_8888, PIXEL_FORMAT_RGBX_8888, PIXEL_FORMAT_BGRA_8888
+
+import numpy as np
+
+def screencap(pixels: np.ndarray, pixel_format: int, colorspace: bool) -> bytes:
+    height, width = pixels.shape[:2]
+    header = [width, height, pixel_format] + ([1] if colorspace else [])
+    return np.array(header, "<u4").tobytes() + pixels.tobytes()
+
+RGBA = np.array([[[255, 0, 0, 255], [0, 255, 0, 255], [0, 0, 255, 255]],
+                 [[10, 20, 30, 255], [40, 50, 60, 0], [70, 80, 90, 128]]], np.uint8)
+
+@pytest.mark.parametrize("colorspace", [False, True], ids=["12 字节文件头", "16 字节文件头"])
+@pytest.mark.parametrize("pixel_format", [PIXEL_FORMAT_RGBA_8888, PIXEL_FORMAT_RGBX_8888])
+def test_parse_rgba(pixel_format, colorspace):
+    array = parse_screencap(screencap(RGBA, pixel_format, colorspace))
+    assert array.shape == (2, 3, 3)
+    assert array[0].tolist() == [[0, 0, 255], [0, 255, 0], [255, 0, 0]], "RGBA 未转换为 BGR"
+    assert array[1, 0].tolist() == [30, 20, 10]
+    assert array.flags.writeable and array.flags.c_contiguous
+
+def test_parse_bgra():
+    array = parse_screencap(screencap(RGBA, PIXEL_FORMAT_BGRA_8888, True))
+    assert array.tolist() == RGBA[:, :, :3].tolist()
+
+@pytest.mark.parametrize("data", [
+    b"\x00" * 8,
+    screencap(RGBA, 4, True),
+    screencap(RGBA, PIXEL_FORMAT_RGBA_8888, True)[:-1],
+    screencap(RGBA, PIXEL_FORMAT_RGBA_8888, True) + b"\x00" * 8,
+], ids=["过短", "不支持的像素格式", "数据不完整", "文件头长度错误"])
+def test_parse_invalid(data):
+    with pytest.raises(ValueError):
+        parse_screencap(data)
@@ -0,0 +1,81 @@
+import pytest
+
+pytest.importorskip("actuator.devices", reason="缺少设备后端依赖")
+
+from actuator.devices.adb.shell_session import AdbShellSession, ShellSendError
+from adbutils import AdbError
+
+import socket
+import subprocess
+
+class ShellConnection:
+    """用本地 sh 进程模拟设备上的 shell 连接"""
+    def __init__(self):
+        self.conn, remote = socket.socketpair()
+        self.process = subprocess.Popen(["sh"], stdin=remote, stdout=remote, stderr=remote)
+        remote.close()
+
+    @property
+    def closed(self) -> bool:
+        return self.conn.fileno() == -1
+
+    def close(self):
+        self.conn.close()
+        self.process.kill()
+        self.process.wait()
+
+class FakeDevice:
+    serial = "fake"
+
+    def __init__(self):
+        self.connections: list[ShellConnection] = []
+        self.offline = False
+
+    def open_shell(self, cmd: str) -> ShellConnection:
+        if self.offline:
+            raise AdbError("device offline")
+        self.connections.append(ShellConnection())
+        return self.connections[-1]
+
+@pytest.fixture
+def device():
+    device = FakeDevice()
+    yield device
+    for connection in device.connections:
+        connection.close()
+
+def test_framing(device):
+    session = AdbShellSession(device, timeout=5)
+    results = session.run_many(["echo a", "printf 'b\\nc'", "false", 'echo "it\'s"', "cat"])
+    assert results == [("a\n", 0), ("b\nc", 0), ("", 1), ("it's\n", 0), ("", 0)]
+
+    # 引号不完整的命令只会失败，不影响之后的命令
+    output, code = session.run_many(['input text "abc'])[0]
+    assert code != 0
+    assert session.run("echo ok") == "ok\n"
+    assert len(device.connections) == 1
+
+def test_reconnect(device):
+    session = AdbShellSession(device, timeout=5)
+    assert session.run("echo 1") == "1\n"
+
+    device.connections[0].process.kill()
+    device.connections[0].process.wait()
+    assert session.run("echo 2") == "2\n"
+    assert len(device.connections) == 2
+
+def test_send_error(device):
+    session = AdbShellSession(device, timeout=5)
+    device.offline = True
+    with pytest.raises(ShellSendError):
+        session.run("echo 1")
+
+def test_timeout(device):
+    session = AdbShellSession(device, timeout=5)
+    with pytest.raises(OSError) as error:
+        session.run("sleep 1", timeout=0.1)
+    assert not isinstance(error.value, ShellSendError), "命令已发出，超时后不能重新执行"
+    assert not session.connected
+
+    assert session.run("echo ok") == "ok\n"
+    assert len(device.connections) == 2
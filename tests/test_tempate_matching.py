@@ -1,7 +1,13 @@
-from actuator.utils.image import template_matching, diff_size_template_matching
+from actuator.utils.image import template_matching, region_template_matching, near_template_matching, color_template_matching, multi_template_matching, first_template_matching, diff_size_template_matching, feature_matching, feature_matching_corners, TemplateRegistry, Template
+from actuator.model import Image
 
 from pathlib import Path
 
+import importlib
+import os
+import cv2
+import numpy as np
+
 path = Path(__file__).parent / "test_image"
 
 def open_image(image_path: Path, tmpl_path: Path) -> tuple[bytes, bytes]:
@@ -35,4 +41,179 @@ def test_template_matching():
     
     result = template_matching(image, tmpl)
     
-    assert len(result[0]) > 0, "模板匹配失败"
\ No newline at end of file
+    assert len(result[0]) > 0, "模板匹配失败"
+
+def synthetic_image(seed: int = 0) -> np.ndarray:
+    """生成随机纹理的测试截图"""
+    rng = np.random.default_rng(seed)
+    image = rng.integers(0, 255, (300, 400), dtype=np.uint8)
+    return cv2.GaussianBlur(image, (5, 5), 0)
+
+def to_image(array: np.ndarray) -> Image:
+    return Image(cv2.imencode(".png", array)[1].tobytes())
+
+def test_template_registry(tmp_path, monkeypatch):
+    screen = synthetic_image()
+    tmpl_file = tmp_path / "button.png"
+    tmpl_file.write_bytes(cv2.imencode(".png", screen[100:140, 200:260])[1].tobytes())
+
+    registry = TemplateRegistry()
+    template = registry.register("button", tmpl_file)
+    assert registry.get("button") is template, "模板未被缓存"
+    assert registry.get(str(tmpl_file)) is template, "模板未按路径缓存"
+
+    os.utime(tmpl_file, (0, 0))
+    assert registry.get("button") is not template, "模板文件修改后未重新载入"
+
+    monkeypatch.chdir(tmp_path.parent)
+    assert registry.get("button.png", tmp_path).path == tmpl_file.resolve(), "相对路径未在指定目录下查找"
+
+    # 使用局部注册表，避免名称泄漏到其他测试
+    monkeypatch.setattr(importlib.import_module("actuator.utils.image.tempate_matching"), "template_registry", registry)
+    result = template_matching(to_image(screen), "button")
+    assert result[0].to_tuple() == (230, 120), "按名称匹配模板失败"
+
+def test_template_scaled_cache(monkeypatch):
+    monkeypatch.setattr(Template, "max_scaled", 4)
+    template = Template(synthetic_image()[100:140, 200:260])
+
+    first = template.scaled(0.5)
+    assert template.scaled(0.5) is first, "缩放结果未缓存"
+    for scale in (0.6, 0.7, 0.8, 0.9):
+        template.scaled(scale)
+    assert len(template._scaled) == 4, "缩放缓存超过上限"
+    assert template.scaled(0.5) is not first, "最久未使用的缩放结果未被淘汰"
+    assert template.scaled(0.5).shape == (20, 30)
+
+def ui_template() -> np.ndarray:
+    """生成按钮样式的测试模板"""
+    tmpl = np.full((120, 240), 240, np.uint8)
+    cv2.rectangle(tmpl, (10, 10), (230, 110), 60, 4)
+    cv2.putText(tmpl, "OK Go", (40, 80), cv2.FONT_HERSHEY_SIMPLEX, 1.6, 20, 4)
+    return tmpl
+
+def test_pyramid_diff_size_template_matching():
+    tmpl = ui_template()
+    screen = np.full((540, 960), 128, np.uint8)
+    resized = cv2.resize(tmpl, (144, 72), interpolation=cv2.INTER_AREA)
+    screen[300:372, 500:644] = resized
+
+    result = diff_size_template_matching(to_image(screen), Template(tmpl), 0.9, pyramid=True)
+    assert len(result) > 0, "金字塔模板匹配失败"
+    assert all(abs(point.x - 572) <= 2 and abs(point.y - 336) <= 2 for point in result), "金字塔模板匹配位置错误"
+
+def test_pyramid_multi_instance_template_matching():
+    tmpl = ui_template()
+    screen = np.full((540, 960), 128, np.uint8)
+    resized = cv2.resize(tmpl, (168, 84), interpolation=cv2.INTER_AREA)
+    for x in (60, 380, 700):
+        for y in (60, 340):
+            screen[y:y + 84, x:x + 168] = resized
+    image = to_image(screen)
+
+    full = diff_size_template_matching(image, Template(tmpl), 0.9)
+    pyramid = diff_size_template_matching(image, Template(tmpl), 0.9, pyramid=True)
+    assert len(full) == 6, "多尺度模板匹配未找到全部目标"
+    assert sorted(point.to_tuple() for point in pyramid) == sorted(point.to_tuple() for point in full), "金字塔模板匹配遗漏了相同的目标"
+
+def test_parallel_template_matching():
+    screen = synthetic_image()
+    image = to_image(screen)
+    tmpl = Template(screen[100:140, 200:260])
+
+    assert template_matching(image, tmpl, workers=4)[0].to_tuple() == (230, 120), "并行模板匹配失败"
+
+    serial = diff_size_template_matching(image, tmpl, 0.95)
+    parallel = diff_size_template_matching(image, tmpl, 0.95, workers=4)
+    assert [point.to_tuple() for point in serial] == [point.to_tuple() for point in parallel], "并行多尺度匹配结果与串行不一致"
+
+    early = diff_size_template_matching(image, tmpl, 0.95, workers=4, stop_confidence=0.99)
+    assert [point.to_tuple() for point in early] == [(230, 120)], "达到目标信心度后未提前停止"
+
+def test_template_matching_nms():
+    tmpl = ui_template()
+    screen = np.full((400, 800), 128, np.uint8)
+    screen[50:170, 50:290] = tmpl
+    screen[250:370, 400:640] = tmpl
+
+    result = template_matching(to_image(screen), Template(tmpl), 0.8)
+    assert sorted(point.to_tuple() for point in result) == [(170, 110), (520, 310)], "重复结果未合并"
+    assert len(template_matching(to_image(screen), Template(tmpl), 0.8, max_results=1)) == 1, "max_results 未生效"
+
+def test_template_matching_search_region():
+    tmpl = ui_template()
+    screen = np.full((400, 800), 128, np.uint8)
+    screen[50:170, 50:290] = tmpl
+    screen[250:370, 400:640] = tmpl
+    image = to_image(screen)
+
+    assert [point.to_tuple() for point in near_template_matching(image, Template(tmpl), 500, 300, 50)] == [(520, 310)], "未优先搜索附近区域"
+    assert [point.to_tuple() for point in region_template_matching(image, Template(tmpl), 0, 0, 300, 200)] == [(170, 110)], "未优先搜索指定区域"
+    assert len(region_template_matching(image, Template(tmpl), 700, 0, 800, 100)) == 2, "区域内未找到时未回退到整张图片"
+    assert [point.to_tuple() for point in region_template_matching(image, Template(tmpl), 300, 200, 0, 0)] == [(170, 110)], "区域坐标顺序颠倒时未优先搜索指定区域"
+
+def test_multi_template_matching():
+    tmpl = ui_template()
+    screen = np.full((400, 800), 128, np.uint8)
+    screen[250:370, 400:640] = tmpl
+    image = to_image(screen)
+    other = Template(synthetic_image()[0:60, 0:60])
+
+    results = multi_template_matching(image, {"other": other, "button": Template(tmpl)}, 0.8)
+    assert list(results) == ["button"] and results["button"][0].to_tuple() == (520, 310), "多模板匹配失败"
+    parallel = multi_template_matching(image, {"other": other, "button": Template(tmpl)}, 0.8, workers=4)
+    assert {name: [point.to_tuple() for point in points] for name, points in parallel.items()} == {"button": [(520, 310)]}, "并行多模板匹配失败"
+    assert first_template_matching(image, {"other": other, "button": Template(tmpl), "again": Template(tmpl)}, 0.8)[0] == "button", "未返回第一个找到的模板"
+
+def test_feature_matching():
+    tmpl = synthetic_image(1)[50:250, 100:300]
+    matrix = cv2.getRotationMatrix2D((100, 100), 30, 1.5)
+    matrix[:, 2] += (500, 260)
+    screen = cv2.warpAffine(tmpl, matrix, (1280, 720), borderValue=128)
+    template = Template(tmpl)
+
+    for method in ("orb", "akaze"):
+        point = feature_matching(to_image(screen), template, method)
+        assert point is not None and abs(point.x - 600) <= 3 and abs(point.y - 360) <= 3, f"{method} 特征点匹配失败"
+        assert len(feature_matching_corners(to_image(screen), template, method)) == 4
+    assert ("features", "orb") in template.cache, "模板特征点未缓存"
+    assert feature_matching(to_image(np.full((720, 1280), 128, np.uint8)), template) is None, "空白画面不应匹配"
+
+def test_masked_template_matching():
+    icon = np.zeros((40, 40, 4), np.uint8)
+    cv2.circle(icon, (20, 20), 15, (0, 200, 255, 255), -1)
+    cv2.putText(icon, "x", (12, 28), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 0, 255), 2)
+    screen = cv2.cvtColor(synthetic_image(), cv2.COLOR_GRAY2BGR)
+    alpha = icon[:, :, 3:] / 255
+    screen[100:140, 200:240] = (icon[:, :, :3] * alpha + screen[100:140, 200:240] * (1 - alpha)).astype(np.uint8)
+
+    template = Template(icon)
+    assert template.mask is not None, "未从透明通道生成遮罩"
+    assert [point.to_tuple() for point in template_matching(to_image(screen), template, 0.9)] == [(220, 120)], "遮罩匹配失败"
+    assert template_matching(to_image(screen), Template(icon[:, :, :3]), 0.9) == [], "不带遮罩时透明部分应影响匹配"
+    assert [point.to_tuple() for point in template_matching(to_image(screen), template, 0.9, workers=3)] == [(220, 120)], "并行遮罩匹配失败"
+
+def test_color_template_matching():
+    button = np.zeros((40, 100, 3), np.uint8)
+    button[:] = (40, 40, 200)
+    cv2.putText(button, "OK", (30, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 255, 255), 2)
+    disabled = button.copy()
+    disabled[(button == (40, 40, 200)).all(axis=2)] = (128, 128, 128)
+    screen = np.full((300, 400, 3), 30, np.uint8)
+    screen[50:90, 50:150] = disabled
+    screen[200:240, 250:350] = button
+
+    assert len(template_matching(to_image(screen), Template(button), 0.8)) == 2
+    assert [point.to_tuple() for point in color_template_matching(to_image(screen), Template(button), 0.8)] == [(300, 220)], "彩色匹配未排除颜色不同的结果"
+
+def test_cropped_template_matching():
+    tmpl = ui_template()
+    screen = np.full((400, 800), 128, np.uint8)
+    screen[250:370, 400:640] = tmpl
+    cropped = to_image(screen).view(300, 200, 700, 400)
+
+    assert [point.to_tuple() for point in template_matching(cropped, Template(tmpl), 0.8)] == [(520, 310)], "结果未换算为原始截图中的坐标"
+    assert [point.to_tuple() for point in near_template_matching(cropped, Template(tmpl), 520, 310, 10, 0.8)] == [(520, 310)], "near 应为原始截图中的坐标"
+    assert multi_template_matching(cropped, {"button": Template(tmpl)}, 0.8)["button"][0].to_tuple() == (520, 310)
+    point = diff_size_template_matching(cropped, Template(tmpl), 0.8, max_results=1, pyramid=True)[0]
+    assert abs(point.x - 520) <= 2 and abs(point.y - 310) <= 2, "多尺度匹配结果未换算为原始截图中的坐标"
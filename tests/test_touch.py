@@ -0,0 +1,137 @@
+import pytest
+
+pytest.importorskip("actuator.devices", reason="缺少设备后端依赖")
+
+from actuator.devices.adb.touch import (
+    SendeventTouch, TouchScreen, parse_getevent, parse_rotation, interpolate,
+    ABS_MT_SLOT, ABS_MT_POSITION_X, ABS_MT_POSITION_Y, ABS_MT_TRACKING_ID, BTN_TOUCH,
+)
+from actuator.model import Point
+
+GETEVENT = """add device 1: /dev/input/event4
+  name:     "gpio-keys"
+  events:
+    KEY (0001): 0072  0073  0074
+  input props:
+    <none>
+add device 2: /dev/input/event2
+  name:     "sec_e-pen"
+  events:
+    KEY (0001): 0140  014a
+    ABS (0003): 0035  : value 0, min 0, max 16383, fuzz 0, flat 0, resolution 0
+                0036  : value 0, min 0, max 16383, fuzz 0, flat 0, resolution 0
+add device 3: /dev/input/event3
+  name:     "sec_touchscreen"
+  events:
+    KEY (0001): 0145  014a
+    ABS (0003): 002f  : value 0, min 0, max 9, fuzz 0, flat 0, resolution 0
+                0030  : value 0, min 0, max 255, fuzz 0, flat 0, resolution 0
+                0035  : value 0, min 0, max 4095, fuzz 0, flat 0, resolution 0
+                0036  : value 0, min 0, max 8191, fuzz 0, flat 0, resolution 0
+                0039  : value 0, min 0, max 65535, fuzz 0, flat 0, resolution 0
+  input props:
+    INPUT_PROP_DIRECT
+add device 4: /dev/input/event1
+  name:     "mtk-tpd"
+  events:
+    ABS (0003): 0035  : value 0, min -100, max 1179, fuzz 0, flat 0, resolution 0
+                0036  : value 0, min 0, max 2399, fuzz 0, flat 0, resolution 0
+                0039  : value 0, min 0, max 9, fuzz 0, flat 0, resolution 0
+"""
+
+def test_parse_getevent():
+    screens = parse_getevent(GETEVENT)
+    assert [screen.path for screen in screens] == ["/dev/input/event3", "/dev/input/event2", "/dev/input/event1"], "名称含 touch 的设备应排在前面，按键设备应被忽略"
+
+    touch = screens[0]
+    assert touch.name == "sec_touchscreen" and touch.slots and touch.max_fingers == 10
+    assert touch.ranges[ABS_MT_POSITION_X] == (0, 4095) and touch.ranges[ABS_MT_POSITION_Y] == (0, 8191)
+    assert BTN_TOUCH in touch.keys
+
+    protocol_a = screens[2]
+    assert not protocol_a.slots and protocol_a.ranges[ABS_MT_POSITION_X] == (-100, 1179) and protocol_a.keys == set()
+
+    assert parse_getevent("") == []
+
+@pytest.mark.parametrize("output, rotation", [
+    ("      SurfaceOrientation: 0", 0),
+    ("      SurfaceOrientation: 1", 1),
+    ("      SurfaceOrientation: 3", 3),
+    ("    Viewport INTERNAL: displayId=0, orientation=ROTATION_90, logicalFrame=[0, 0, 2340, 1080]", 1),
+    ("    Viewport INTERNAL: displayId=0, orientation=ROTATION_180, logicalFrame=[0, 0, 1080, 2340]", 2),
+    ("    Viewport INTERNAL: displayId=0, orientation=ROTATION_270, logicalFrame=[0, 0, 2340, 1080]", 3),
+    ("", 0),
+])
+def test_parse_rotation(output, rotation):
+    assert parse_rotation(output) == rotation
+
+@pytest.mark.parametrize("path, samples, expected", [
+    ([(5, 5)], 2, [(5, 5), (5, 5), (5, 5)]),
+    ([(0, 0), (100, 0)], 4, [(0, 0), (25, 0), (50, 0), (75, 0), (100, 0)]),
+    ([(0, 0), (100, 0), (100, 100)], 4, [(0, 0), (50, 0), (100, 0), (100, 50), (100, 100)]),
+    ([(0, 0), (0, 0), (30, 40)], 1, [(0, 0), (30, 40)]),
+])
+def test_interpolate(path, samples, expected):
+    assert interpolate(path, samples) == pytest.approx(expected)
+
+def screen(x_range: tuple[int, int] = (0, 4000), y_range: tuple[int, int] = (0, 8000), slots: bool = True) -> TouchScreen:
+    ranges = {ABS_MT_POSITION_X: x_range, ABS_MT_POSITION_Y: y_range, ABS_MT_TRACKING_ID: (0, 65535)}
+    if slots:
+        ranges[ABS_MT_SLOT] = (0, 9)
+    return TouchScreen("/dev/input/event3", "touchscreen", ranges, {BTN_TOUCH})
+
+# 自然方向分辨率 1000x2000，触摸屏坐标范围是其 4 倍
+@pytest.mark.parametrize("rotation, point, expected", [
+    (0, (100, 200), (400, 800)),
+    (0, (1000, 2000), (4000, 8000)),
+    (0, (-5, 3000), (0, 8000)),
+    (1, (100, 200), (3200, 400)),
+    (1, (0, 0), (4000, 0)),
+    (1, (2000, 1000), (0, 8000)),
+    (2, (100, 200), (3600, 7200)),
+    (2, (0, 0), (4000, 8000)),
+    (3, (100, 200), (800, 7600)),
+    (3, (0, 0), (0, 8000)),
+    (3, (2000, 1000), (4000, 0)),
+])
+def test_rotation_mapping(rotation, point, expected):
+    touch = SendeventTouch(screen(), (1000, 2000), rotation)
+    assert touch._to_touch(*point) == expected
+
+def test_axis_offset():
+    touch = SendeventTouch(screen((100, 1100), (-50, 1950)), (1000, 2000))
+    assert touch._to_touch(0, 0) == (100, -50)
+    assert touch._to_touch(500, 1000) == (600, 950)
+
+def test_tap_protocol_b():
+    lines = SendeventTouch(screen(), (1000, 2000)).tap(100, 200).splitlines()
+    assert lines[:6] == [
+        "sendevent /dev/input/event3 3 47 0",
+        "sendevent /dev/input/event3 3 57 1",
+        "sendevent /dev/input/event3 3 53 400",
+        "sendevent /dev/input/event3 3 54 800",
+        "sendevent /dev/input/event3 1 330 1",
+        "sendevent /dev/input/event3 0 0 0",
+    ]
+    assert lines[-4:] == [
+        "sendevent /dev/input/event3 3 47 0",
+        "sendevent /dev/input/event3 3 57 -1",
+        "sendevent /dev/input/event3 1 330 0",
+        "sendevent /dev/input/event3 0 0 0",
+    ]
+    assert sum(line.startswith("sleep") for line in lines) == 1
+
+def test_gesture_protocol_a():
+    touch = SendeventTouch(screen(slots=False), (1000, 2000), rate=10)
+    script = touch.gesture([[Point(x=100, y=100), Point(x=100, y=500)], [(900, 100), (900, 500)]], 0.2)
+    lines = script.splitlines()
+    assert sum(line.startswith("sleep 0.100") for line in lines) == 2
+    assert lines.count("sendevent /dev/input/event3 0 2 0") == 3 * 2 + 1, "A 协议每次同步都应报告全部手指"
+    assert lines[-3:] == [
+        "sendevent /dev/input/event3 0 2 0",
+        "sendevent /dev/input/event3 1 330 0",
+        "sendevent /dev/input/event3 0 0 0",
+    ]
+
+    with pytest.raises(ValueError):
+        touch.gesture([], 0.1)
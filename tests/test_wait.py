@@ -0,0 +1,95 @@
+from actuator.utils.wait import wait_until, wait_for_text, wait_for_template, wait_for_color, wait_for_change
+from actuator.utils.image import Template
+from actuator.model import Image
+
+from threading import Event, Timer
+from time import monotonic
+
+import numpy as np
+
+class SequenceDevice:
+    """依次返回给定的画面，之后一直返回最后一张"""
+    def __init__(self, arrays: list[np.ndarray]):
+        self.arrays = arrays
+        self.captures = 0
+
+    def screenshot(self):
+        array = self.arrays[min(self.captures, len(self.arrays) - 1)]
+        self.captures += 1
+        return None, Image.from_array(array.copy())
+
+def screen(box: tuple[int, int, int, int] = None, color: tuple[int, int, int] = (255, 255, 255)) -> np.ndarray:
+    array = np.full((200, 300, 3), 40, np.uint8)
+    if box:
+        x1, y1, x2, y2 = box
+        array[y1:y2, x1:x2] = color
+    return array
+
+def test_wait_until_skips_identical_frames():
+    device = SequenceDevice([screen()] * 5 + [screen((10, 10, 11, 11))])
+    checked = []
+
+    def check(image: Image) -> bool:
+        checked.append(image)
+        return image.array[10, 10, 0] == 255
+
+    assert wait_until(device, check, timeout=5, interval=0.001)
+    assert len(checked) == 2, "相同的画面不应重复检查，1 像素的变化必须检查"
+
+def test_wait_for_color_small_change():
+    device = SequenceDevice([screen()] * 3 + [screen((50, 50, 51, 51), (0, 0, 255))])
+    assert wait_for_color(device, 50, 50, "#FF0000", timeout=5, interval=0.001)
+
+    # 变为亮度相近的灰色也要能发现
+    red, gray = screen((40, 40, 46, 46), (0, 0, 255)), screen((40, 40, 46, 46), (76, 76, 76))
+    device = SequenceDevice([red] * 3 + [gray])
+    assert wait_for_color(device, 42, 42, "#4C4C4C", timeout=5, interval=0.001)
+
+    device = SequenceDevice([screen()])
+    assert not wait_for_color(device, 50, 50, "#FF0000", timeout=0.05, interval=0.001)
+
+def test_wait_for_text_small_change():
+    def ocr(image: Image, lang: str) -> list:
+        if image.array[20, 20, 0] != 255:
+            return [[]]
+        return [[[[[90, 95], [110, 95], [110, 105], [90, 105]], ("确定", 0.99)]]]
+
+    device = SequenceDevice([screen()] * 3 + [screen((20, 20, 21, 21))])
+    assert wait_for_text(device, "确定", timeout=5, interval=0.001, ocr=ocr).to_tuple() == (100, 100)
+
+    device = SequenceDevice([screen()])
+    assert wait_for_text(device, "确定", timeout=0.05, interval=0.001, ocr=ocr) is None
+
+def test_wait_for_template():
+    icon = np.zeros((20, 20, 3), np.uint8)
+    icon[5:15, 5:15] = (0, 200, 255)
+    icon[8:12, :] = (255, 0, 0)
+    template = Template(icon, "icon")
+
+    found = screen()
+    found[100:120, 150:170] = icon
+    device = SequenceDevice([screen()] * 3 + [found])
+    assert wait_for_template(device, template, timeout=5, interval=0.001).to_tuple() == (160, 110)
+
+def test_wait_for_change_small_change():
+    device = SequenceDevice([screen()] * 3 + [screen((30, 30, 31, 31))])
+    assert wait_for_change(device, timeout=5, interval=0.001) == [(29, 29, 32, 32)], "变化区域包含膨胀的 1 像素"
+
+    # 亮度不变的色相变化
+    red, gray = screen((40, 40, 46, 46), (0, 0, 255)), screen((40, 40, 46, 46), (76, 76, 76))
+    device = SequenceDevice([red] * 3 + [gray])
+    assert wait_for_change(device, timeout=5, interval=0.001) == [(39, 39, 47, 47)]
+
+    device = SequenceDevice([screen()])
+    assert wait_for_change(device, timeout=0.05, interval=0.001) is None
+
+def test_wait_cancel():
+    device = SequenceDevice([screen()])
+    cancel_event = Event()
+    Timer(0.05, cancel_event.set).start()
+
+    start = monotonic()
+    assert not wait_for_color(device, 0, 0, "#FFFFFF", timeout=5, interval=0.01, cancel_event=cancel_event)
+    assert monotonic() - start < 1, "取消后应立即返回"
+
+    assert wait_for_change(device, timeout=5, cancel=lambda: True) is None